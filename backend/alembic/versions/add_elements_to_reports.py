@@ -9,6 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -20,7 +21,7 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     # Add elements column for new ReportBro-style designer
-    op.add_column('reports', sa.Column('elements', sa.JSON(), nullable=True, server_default='[]'))
+    op.add_column('reports', sa.Column('elements', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
 
 
 def downgrade() -> None:
@@ -9,6 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -27,27 +28,37 @@ def upgrade() -> None:
         sa.Column('description', sa.Text(), nullable=True),
         sa.Column('file_path', sa.String(500), nullable=True),
         sa.Column('file_name', sa.String(255), nullable=True),
-        sa.Column('structure', sa.JSON(), nullable=True, server_default='{}'),
+        sa.Column('structure', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
         sa.Column('is_archived', sa.Boolean(), nullable=False, server_default='false'),
         sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
         sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('ix_excel_templates_id', 'excel_templates', ['id'])
 
-    # Add template_id column to excel_template_reports
-    op.add_column('excel_template_reports', sa.Column('template_id', sa.Integer(), nullable=True))
+    # Concurrent index builds cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_excel_templates_id', 'excel_templates', ['id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
 
-    # Add sheet_data column for cell modifications
-    op.add_column('excel_template_reports', sa.Column('sheet_data', sa.JSON(), nullable=True, server_default='{}'))
-
-    # Add data_sources column for visualization mappings
-    op.add_column('excel_template_reports', sa.Column('data_sources', sa.JSON(), nullable=True, server_default='[]'))
+    # Add template_id, sheet_data (cell modifications) and data_sources
+    # (visualization mappings) in one ALTER TABLE so the table is only
+    # locked and rewritten once
+    op.execute(
+        "ALTER TABLE excel_template_reports "
+        "ADD COLUMN template_id integer, "
+        "ADD COLUMN sheet_data jsonb, "
+        "ADD COLUMN data_sources jsonb"
+    )
 
 
 def downgrade() -> None:
-    op.drop_column('excel_template_reports', 'data_sources')
-    op.drop_column('excel_template_reports', 'sheet_data')
-    op.drop_column('excel_template_reports', 'template_id')
-    op.drop_index('ix_excel_templates_id', table_name='excel_templates')
+    op.execute(
+        "ALTER TABLE excel_template_reports "
+        "DROP COLUMN data_sources, "
+        "DROP COLUMN sheet_data, "
+        "DROP COLUMN template_id"
+    )
+    op.drop_index('ix_excel_templates_id', table_name='excel_templates', if_exists=True)
     op.drop_table('excel_templates')
@@ -0,0 +1,74 @@
+"""Store excel_templates.structure as zlib-compressed bytea
+
+Revision ID: compress_structure_001
+Revises: jsonb_columns_001
+Create Date: 2026-01-21
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'compress_structure_001'
+down_revision: Union[str, None] = 'jsonb_columns_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The structure is no longer queryable in SQL, so its GIN index goes away
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_excel_templates_structure_gin',
+            table_name='excel_templates',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+    op.add_column('excel_templates', sa.Column('structure_zlib', sa.LargeBinary(), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text("SELECT id, structure::text FROM excel_templates WHERE structure IS NOT NULL")
+    ).all()
+    for template_id, structure in rows:
+        conn.execute(
+            sa.text("UPDATE excel_templates SET structure_zlib = :data WHERE id = :id"),
+            {"data": zlib.compress(structure.encode("utf-8")), "id": template_id},
+        )
+
+    op.drop_column('excel_templates', 'structure')
+    op.alter_column('excel_templates', 'structure_zlib', new_column_name='structure')
+
+
+def downgrade() -> None:
+    op.add_column('excel_templates', sa.Column('structure_json', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text("SELECT id, structure FROM excel_templates WHERE structure IS NOT NULL")
+    ).all()
+    for template_id, structure in rows:
+        conn.execute(
+            sa.text("UPDATE excel_templates SET structure_json = CAST(:data AS jsonb) WHERE id = :id"),
+            {"data": zlib.decompress(structure).decode("utf-8"), "id": template_id},
+        )
+
+    op.drop_column('excel_templates', 'structure')
+    op.alter_column('excel_templates', 'structure_json', new_column_name='structure')
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_excel_templates_structure_gin',
+            'excel_templates',
+            ['structure'],
+            postgresql_using='gin',
+            postgresql_ops={'structure': 'jsonb_path_ops'},
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
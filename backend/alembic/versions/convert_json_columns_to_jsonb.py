@@ -0,0 +1,69 @@
+"""Convert report/template JSON columns to JSONB with GIN indexes
+
+Revision ID: jsonb_columns_001
+Revises: add_excel_templates_001
+Create Date: 2026-01-20
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'jsonb_columns_001'
+down_revision: Union[str, None] = 'add_excel_templates_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column) for every column stored as json before this revision
+JSONB_COLUMNS = [
+    ('reports', 'elements'),
+    ('excel_templates', 'structure'),
+    ('excel_template_reports', 'placeholders'),
+    ('excel_template_reports', 'mappings'),
+    ('excel_template_reports', 'sheet_data'),
+    ('excel_template_reports', 'data_sources'),
+]
+
+# Columns queried by containment (@>), indexed with jsonb_path_ops
+GIN_INDEXES = [
+    ('ix_reports_elements_gin', 'reports', 'elements'),
+    ('ix_excel_templates_structure_gin', 'excel_templates', 'structure'),
+    ('ix_excel_template_reports_sheet_data_gin', 'excel_template_reports', 'sheet_data'),
+    ('ix_excel_template_reports_mappings_gin', 'excel_template_reports', 'mappings'),
+]
+
+
+def upgrade() -> None:
+    # Older databases were created with json columns and a '[]'/'{}' server
+    # default. The default is typed as json, so it has to go before the type
+    # change, and it is not restored: the ORM fills empty values on insert.
+    for table, column in JSONB_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb")
+
+    # Build the GIN indexes without blocking writes; CONCURRENTLY cannot run
+    # inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, column in GIN_INDEXES:
+            op.create_index(
+                name,
+                table,
+                [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'jsonb_path_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _column in reversed(GIN_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    for table, column in reversed(JSONB_COLUMNS):
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE json USING {column}::json")
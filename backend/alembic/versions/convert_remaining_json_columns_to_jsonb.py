@@ -0,0 +1,58 @@
+"""Convert the remaining json columns to JSONB
+
+Revision ID: jsonb_columns_002
+Revises: share_token_index_001
+Create Date: 2026-01-23
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'jsonb_columns_002'
+down_revision: Union[str, None] = 'share_token_index_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column) for every column still stored as json after jsonb_columns_001
+JSONB_COLUMNS = [
+    ('reports', 'blocks'),
+    ('reports', 'settings'),
+    ('visualizations', 'mbql_query'),
+    ('visualizations', 'visualization_settings'),
+    ('visualization_customizations', 'custom_colors'),
+    ('visualization_customizations', 'custom_labels'),
+    ('visualization_customizations', 'goal_lines'),
+    ('visualization_customizations', 'reference_lines'),
+    ('visualization_customizations', 'hidden_columns'),
+    ('visualization_customizations', 'column_order'),
+    ('visualization_customizations', 'column_widths'),
+    ('visualization_customizations', 'conditional_formatting'),
+    ('dashboards', 'layout_config'),
+    ('dashboards', 'global_filters'),
+    ('dashboard_cards', 'responsive_layouts'),
+    ('dashboard_cards', 'custom_styling'),
+    ('dashboard_cards', 'filter_mappings'),
+    ('dashboard_filters', 'default_value'),
+    ('dashboard_filters', 'options'),
+    ('database_connection_metadata', 'tags'),
+    ('database_connection_metadata', 'schema_documentation'),
+    ('database_connection_metadata', 'relationships'),
+    ('database_connection_metadata', 'allowed_users'),
+]
+
+
+def upgrade() -> None:
+    # Same approach as jsonb_columns_001: any json-typed default has to go
+    # before the type change, and the ORM fills empty values on insert
+    for table, column in JSONB_COLUMNS:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE jsonb USING {column}::jsonb")
+
+
+def downgrade() -> None:
+    for table, column in reversed(JSONB_COLUMNS):
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE json USING {column}::json")
@@ -9,6 +9,7 @@ from typing import Sequence, Union
 
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -26,8 +27,8 @@ def upgrade() -> None:
         sa.Column('description', sa.Text(), nullable=True),
         sa.Column('template_file_path', sa.String(500), nullable=True),
         sa.Column('template_filename', sa.String(255), nullable=True),
-        sa.Column('placeholders', sa.JSON(), nullable=True, server_default='[]'),
-        sa.Column('mappings', sa.JSON(), nullable=True, server_default='{}'),
+        sa.Column('placeholders', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('mappings', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
         sa.Column('is_public', sa.Boolean(), nullable=False, server_default='false'),
         sa.Column('share_token', sa.String(64), nullable=True, unique=True),
         sa.Column('is_archived', sa.Boolean(), nullable=False, server_default='false'),
@@ -35,11 +36,20 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('ix_excel_template_reports_id', 'excel_template_reports', ['id'])
-    op.create_index('ix_excel_template_reports_share_token', 'excel_template_reports', ['share_token'], unique=True)
+
+    # Concurrent index builds cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_excel_template_reports_id', 'excel_template_reports', ['id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.create_index(
+            'ix_excel_template_reports_share_token', 'excel_template_reports', ['share_token'],
+            unique=True, postgresql_concurrently=True, if_not_exists=True,
+        )
 
 
 def downgrade() -> None:
-    op.drop_index('ix_excel_template_reports_share_token', table_name='excel_template_reports')
-    op.drop_index('ix_excel_template_reports_id', table_name='excel_template_reports')
+    op.drop_index('ix_excel_template_reports_share_token', table_name='excel_template_reports', if_exists=True)
+    op.drop_index('ix_excel_template_reports_id', table_name='excel_template_reports', if_exists=True)
     op.drop_table('excel_template_reports')
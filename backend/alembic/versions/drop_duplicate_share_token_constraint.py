@@ -0,0 +1,33 @@
+"""Drop the duplicate unique constraint on excel_template_reports.share_token
+
+Revision ID: share_token_index_001
+Revises: compress_structure_001
+Create Date: 2026-01-22
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'share_token_index_001'
+down_revision: Union[str, None] = 'compress_structure_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # share_token was declared unique on the column *and* given a unique
+    # ix_excel_template_reports_share_token index, so every write maintained
+    # two identical btrees. The named index alone serves the share lookup.
+    op.execute(
+        "ALTER TABLE excel_template_reports "
+        "DROP CONSTRAINT IF EXISTS excel_template_reports_share_token_key"
+    )
+
+
+def downgrade() -> None:
+    op.create_unique_constraint(
+        'excel_template_reports_share_token_key', 'excel_template_reports', ['share_token']
+    )
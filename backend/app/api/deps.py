@@ -0,0 +1,33 @@
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.services.ai_sql import AISQLService
+from app.services.excel_report import ExcelReportService as LegacyExcelReportService
+from app.services.excel_template_service import ExcelTemplateService, ExcelReportService
+from app.services.metabase import MetabaseService
+
+
+async def get_metabase_service(request: Request) -> MetabaseService:
+    """Get the shared Metabase service created at startup."""
+    return request.app.state.metabase
+
+
+async def get_ai_sql_service(request: Request) -> AISQLService:
+    """Get the shared AI SQL service created at startup."""
+    return request.app.state.ai_sql
+
+
+async def get_excel_template_service(db: AsyncSession = Depends(get_db)) -> ExcelTemplateService:
+    """Get an Excel template service bound to the request session."""
+    return ExcelTemplateService(db)
+
+
+async def get_excel_template_report_service(db: AsyncSession = Depends(get_db)) -> ExcelReportService:
+    """Get an Excel (template-based) report service bound to the request session."""
+    return ExcelReportService(db)
+
+
+async def get_legacy_excel_report_service(db: AsyncSession = Depends(get_db)) -> LegacyExcelReportService:
+    """Get a legacy placeholder-based Excel report service bound to the request session."""
+    return LegacyExcelReportService(db)
@@ -1,8 +1,12 @@
+import asyncio
+from operator import itemgetter
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, NamedTuple, Type
 
+from app.api.deps import get_ai_sql_service, get_metabase_service
+from app.core.cache import AsyncTTLCache
 from app.core.database import get_db
 from app.core.security import verify_api_key
 from app.services.ai_sql import AISQLService
@@ -51,53 +55,96 @@ class OllamaStatusResponse(BaseModel):
 # ==================== Helper Functions ====================
 
 
-async def get_database_schema(database_id: int) -> Dict[str, Any]:
+# Schemas change on the scale of minutes, so keep them for 5 minutes per database
+_schema_cache = AsyncTTLCache(ttl=300, maxsize=64)
+
+# The status check runs a prompt through the model, so reuse it for 10 seconds
+_ollama_status_cache = AsyncTTLCache(ttl=10, maxsize=1)
+
+
+async def get_ollama_status(service: AISQLService) -> Dict[str, Any]:
+    """Check Ollama status, reusing a recent result when there is one."""
+    return await _ollama_status_cache.get_or_set("status", service.check_ollama_status)
+
+
+def ollama_unavailable(detail: str) -> HTTPException:
+    """Build a 503 error and drop the cached status so the next call retests."""
+    _ollama_status_cache.invalidate()
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail
+    )
+
+
+async def get_database_schema(database_id: int, metabase: MetabaseService) -> Dict[str, Any]:
     """
-    Fetch database schema from Metabase.
+    Fetch database schema from Metabase (cached per database).
     Returns a structured schema with tables and fields.
     """
-    metabase = MetabaseService()
-    metadata = await metabase.get_database_metadata(database_id)
+    return await _schema_cache.get_or_set(
+        database_id, lambda: _load_database_schema(database_id, metabase)
+    )
 
-    # Extract tables and fields
-    tables = []
-    for table in metadata.get("tables", []):
-        if table.get("visibility_type") == "hidden":
-            continue
-
-        table_info = {
-            "id": table.get("id"),
-            "name": table.get("name"),
-            "schema": table.get("schema"),
-            "display_name": table.get("display_name"),
-            "fields": []
-        }
 
-        for field in table.get("fields", []):
-            if field.get("visibility_type") == "hidden":
-                continue
+# Metabase always sends these keys, so pull them out in a single C-level call
+_TBL_KEYS = itemgetter("id", "name", "schema", "display_name")
+_FLD_KEYS = itemgetter("id", "name", "display_name", "base_type", "semantic_type", "fk_target_field_id")
 
-            field_info = {
-                "id": field.get("id"),
-                "name": field.get("name"),
-                "display_name": field.get("display_name"),
-                "base_type": field.get("base_type"),
-                "semantic_type": field.get("semantic_type"),
-                "pk": field.get("semantic_type") == "type/PK",
-                "fk_target_field_id": field.get("fk_target_field_id"),
-            }
 
-            # If it's a foreign key, try to get target table name
-            if field_info["fk_target_field_id"]:
-                for t in metadata.get("tables", []):
-                    for f in t.get("fields", []):
-                        if f.get("id") == field_info["fk_target_field_id"]:
-                            field_info["fk_target_table"] = t.get("name")
-                            break
+def _build_field(field: Dict[str, Any], field_id_to_table: Dict[int, str]) -> Dict[str, Any]:
+    """Build the schema context entry for a single field."""
+    fid, fname, fdisp, base_type, semantic_type, fk_target_field_id = _FLD_KEYS(field)
+    field_info = {
+        "id": fid,
+        "name": fname,
+        "display_name": fdisp,
+        "base_type": base_type,
+        "semantic_type": semantic_type,
+        "pk": semantic_type == "type/PK",
+        "fk_target_field_id": fk_target_field_id,
+    }
+
+    # If it's a foreign key, try to get target table name
+    if fk_target_field_id and fk_target_field_id in field_id_to_table:
+        field_info["fk_target_table"] = field_id_to_table[fk_target_field_id]
 
-            table_info["fields"].append(field_info)
+    return field_info
 
-        tables.append(table_info)
+
+def _build_table(table: Dict[str, Any], field_id_to_table: Dict[int, str]) -> Dict[str, Any]:
+    """Build the schema context entry for a table, skipping hidden fields."""
+    tid, tname, tschema, tdisp = _TBL_KEYS(table)
+    return {
+        "id": tid,
+        "name": tname,
+        "schema": tschema,
+        "display_name": tdisp,
+        "fields": [
+            _build_field(field, field_id_to_table)
+            for field in table.get("fields", [])
+            if field.get("visibility_type") != "hidden"
+        ],
+    }
+
+
+async def _load_database_schema(database_id: int, metabase: MetabaseService) -> Dict[str, Any]:
+    """Build the schema context from Metabase metadata."""
+    metadata = await metabase.get_database_metadata(database_id)
+    all_tables = metadata.get("tables", [])
+
+    # Map every field id to its table name so FK targets resolve in O(1)
+    field_id_to_table = {
+        f["id"]: t["name"]
+        for t in all_tables
+        for f in t.get("fields", [])
+    }
+
+    # Extract tables and fields, skipping hidden ones before building anything
+    tables = [
+        _build_table(table, field_id_to_table)
+        for table in all_tables
+        if table.get("visibility_type") != "hidden"
+    ]
 
     return {
         "database_id": database_id,
@@ -106,25 +153,74 @@ async def get_database_schema(database_id: int) -> Dict[str, Any]:
     }
 
 
+class AISQLContext(NamedTuple):
+    """Validated request plus everything an AI SQL endpoint needs to run."""
+    request: Any
+    service: AISQLService
+    schema_context: Dict[str, Any]
+
+
+def ai_sql_ready(body_model: Type[BaseModel], require_model: bool = False):
+    """
+    Build a dependency that checks Ollama and fetches the database schema
+    (concurrently) for the given request body, raising 503/400 on failure.
+    """
+    async def dependency(
+        request: body_model,
+        service: AISQLService = Depends(get_ai_sql_service),
+        metabase: MetabaseService = Depends(get_metabase_service),
+    ) -> AISQLContext:
+        ollama_status, schema_context = await asyncio.gather(
+            get_ollama_status(service),
+            get_database_schema(request.database_id, metabase),
+            return_exceptions=True,
+        )
+
+        if not ollama_status.get("available"):
+            raise ollama_unavailable(ollama_status.get("error", "Ollama is not available"))
+
+        if require_model and not ollama_status.get("model_available"):
+            raise ollama_unavailable(
+                f"Model '{service.model}' is not available. Available models: {ollama_status.get('available_models', [])}"
+            )
+
+        if isinstance(schema_context, Exception):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Failed to fetch database schema: {str(schema_context)}"
+            )
+
+        return AISQLContext(request, service, schema_context)
+
+    return dependency
+
+
+generate_ready = ai_sql_ready(GenerateSQLRequest, require_model=True)
+suggest_ready = ai_sql_ready(SuggestQueriesRequest)
+execute_ready = ai_sql_ready(GenerateSQLRequest)
+
+
 # ==================== Endpoints ====================
 
 
 @router.get("/status", response_model=OllamaStatusResponse)
 async def check_ollama_status(
     _api_key: str = Depends(verify_api_key),
+    service: AISQLService = Depends(get_ai_sql_service),
 ):
     """
     Check if Ollama is running and the model is available.
     """
-    service = AISQLService()
-    status = await service.check_ollama_status()
+    status = await get_ollama_status(service)
+    if not status.get("available"):
+        _ollama_status_cache.invalidate()
     return OllamaStatusResponse(**status)
 
 
 @router.post("/generate", response_model=GenerateSQLResponse)
 async def generate_sql(
-    request: GenerateSQLRequest,
     _api_key: str = Depends(verify_api_key),
+    context: AISQLContext = Depends(generate_ready),
 ):
     """
     Generate SQL from natural language using AI.
@@ -132,30 +228,7 @@ async def generate_sql(
     The AI uses the database schema to generate accurate SQL queries.
     Requires Ollama to be running locally.
     """
-    # Check Ollama status first
-    service = AISQLService()
-    ollama_status = await service.check_ollama_status()
-
-    if not ollama_status.get("available"):
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=ollama_status.get("error", "Ollama is not available")
-        )
-
-    if not ollama_status.get("model_available"):
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Model '{service.model}' is not available. Available models: {ollama_status.get('available_models', [])}"
-        )
-
-    # Get database schema
-    try:
-        schema_context = await get_database_schema(request.database_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Failed to fetch database schema: {str(e)}"
-        )
+    request, service, schema_context = context
 
     # Generate SQL
     result = await service.generate_sql(
@@ -169,32 +242,15 @@ async def generate_sql(
 
 @router.post("/suggest", response_model=SuggestQueriesResponse)
 async def suggest_queries(
-    request: SuggestQueriesRequest,
     _api_key: str = Depends(verify_api_key),
+    context: AISQLContext = Depends(suggest_ready),
 ):
     """
     Suggest natural language queries based on the database schema.
 
     Useful for showing users what questions they can ask about their data.
     """
-    # Check Ollama status first
-    service = AISQLService()
-    ollama_status = await service.check_ollama_status()
-
-    if not ollama_status.get("available"):
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=ollama_status.get("error", "Ollama is not available")
-        )
-
-    # Get database schema
-    try:
-        schema_context = await get_database_schema(request.database_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Failed to fetch database schema: {str(e)}"
-        )
+    request, service, schema_context = context
 
     # Generate suggestions
     suggestions = await service.suggest_queries(
@@ -207,8 +263,9 @@ async def suggest_queries(
 
 @router.post("/execute-generated")
 async def execute_generated_sql(
-    request: GenerateSQLRequest,
     _api_key: str = Depends(verify_api_key),
+    context: AISQLContext = Depends(execute_ready),
+    metabase: MetabaseService = Depends(get_metabase_service),
 ):
     """
     Generate SQL from natural language and execute it.
@@ -216,24 +273,7 @@ async def execute_generated_sql(
     This is a convenience endpoint that combines generation and execution.
     Returns both the generated SQL and the query results.
     """
-    # First generate the SQL
-    service = AISQLService()
-    ollama_status = await service.check_ollama_status()
-
-    if not ollama_status.get("available"):
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=ollama_status.get("error", "Ollama is not available")
-        )
-
-    # Get database schema
-    try:
-        schema_context = await get_database_schema(request.database_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Failed to fetch database schema: {str(e)}"
-        )
+    request, service, schema_context = context
 
     # Generate SQL
     result = await service.generate_sql(
@@ -252,7 +292,6 @@ async def execute_generated_sql(
 
     # Execute the generated SQL
     try:
-        metabase = MetabaseService()
         query_result = await metabase.execute_native_query(
             database_id=request.database_id,
             sql=result["sql"]
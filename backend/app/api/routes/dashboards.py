@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
@@ -20,6 +21,11 @@ from app.schemas.dashboard import (
 
 router = APIRouter()
 
+# Validates and encodes a whole list in a single pydantic-core pass
+_dashboard_list = TypeAdapter(List[DashboardResponse])
+_card_list = TypeAdapter(List[DashboardCardResponse])
+_filter_list = TypeAdapter(List[DashboardFilterResponse])
+
 
 # ==================== Dashboard Endpoints ====================
 
@@ -33,7 +39,11 @@ async def list_dashboards(
     """Get all dashboards."""
     service = DashboardService(db)
     dashboards = await service.get_dashboards(include_archived)
-    return dashboards
+    # Validate once and return directly so FastAPI does not re-validate the list
+    return Response(
+        _dashboard_list.dump_json(_dashboard_list.validate_python(dashboards, from_attributes=True)),
+        media_type="application/json",
+    )
 
 
 @router.get("/{dashboard_id}", response_model=DashboardResponse)
@@ -127,16 +137,12 @@ async def add_card(
 ):
     """Add a card to a dashboard."""
     service = DashboardService(db)
-
-    # Verify dashboard exists
-    dashboard = await service.get_dashboard(dashboard_id)
-    if not dashboard:
+    card = await service.add_card(dashboard_id, data)
+    if not card:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Dashboard not found",
         )
-
-    card = await service.add_card(dashboard_id, data)
     return card
 
 
@@ -150,16 +156,7 @@ async def update_card(
 ):
     """Update a card on a dashboard."""
     service = DashboardService(db)
-
-    # Verify dashboard exists
-    dashboard = await service.get_dashboard(dashboard_id)
-    if not dashboard:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Dashboard not found",
-        )
-
-    card = await service.update_card(card_id, data)
+    card = await service.update_card(dashboard_id, card_id, data)
     if not card:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -177,17 +174,16 @@ async def update_cards_bulk(
 ):
     """Update multiple cards at once (for layout changes)."""
     service = DashboardService(db)
-
-    # Verify dashboard exists
-    dashboard = await service.get_dashboard(dashboard_id)
-    if not dashboard:
+    cards = await service.update_cards_bulk(dashboard_id, data.cards)
+    if data.cards and not cards and not await service.dashboard_exists(dashboard_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Dashboard not found",
         )
-
-    cards = await service.update_cards_bulk(dashboard_id, data.cards)
-    return cards
+    return Response(
+        _card_list.dump_json(_card_list.validate_python(cards, from_attributes=True)),
+        media_type="application/json",
+    )
 
 
 @router.delete("/{dashboard_id}/cards/{card_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -199,16 +195,7 @@ async def delete_card(
 ):
     """Remove a card from a dashboard."""
     service = DashboardService(db)
-
-    # Verify dashboard exists
-    dashboard = await service.get_dashboard(dashboard_id)
-    if not dashboard:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Dashboard not found",
-        )
-
-    deleted = await service.delete_card(card_id)
+    deleted = await service.delete_card(dashboard_id, card_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -228,16 +215,12 @@ async def add_filter(
 ):
     """Add a filter to a dashboard."""
     service = DashboardService(db)
-
-    # Verify dashboard exists
-    dashboard = await service.get_dashboard(dashboard_id)
-    if not dashboard:
+    filter_obj = await service.add_filter(dashboard_id, data)
+    if not filter_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Dashboard not found",
         )
-
-    filter_obj = await service.add_filter(dashboard_id, data)
     return filter_obj
 
 
@@ -251,16 +234,7 @@ async def update_filter(
 ):
     """Update a filter on a dashboard."""
     service = DashboardService(db)
-
-    # Verify dashboard exists
-    dashboard = await service.get_dashboard(dashboard_id)
-    if not dashboard:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Dashboard not found",
-        )
-
-    filter_obj = await service.update_filter(filter_id, data)
+    filter_obj = await service.update_filter(dashboard_id, filter_id, data)
     if not filter_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -278,16 +252,7 @@ async def delete_filter(
 ):
     """Remove a filter from a dashboard."""
     service = DashboardService(db)
-
-    # Verify dashboard exists
-    dashboard = await service.get_dashboard(dashboard_id)
-    if not dashboard:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Dashboard not found",
-        )
-
-    deleted = await service.delete_filter(filter_id)
+    deleted = await service.delete_filter(dashboard_id, filter_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -304,14 +269,13 @@ async def reorder_filters(
 ):
     """Reorder filters on a dashboard."""
     service = DashboardService(db)
-
-    # Verify dashboard exists
-    dashboard = await service.get_dashboard(dashboard_id)
-    if not dashboard:
+    filters = await service.reorder_filters(dashboard_id, filter_ids)
+    if not filters and not await service.dashboard_exists(dashboard_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Dashboard not found",
         )
-
-    filters = await service.reorder_filters(dashboard_id, filter_ids)
-    return filters
+    return Response(
+        _filter_list.dump_json(_filter_list.validate_python(filters, from_attributes=True)),
+        media_type="application/json",
+    )
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, UploadFile, File
 from fastapi.responses import StreamingResponse
-from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 from typing import List
-import io
 
-from app.core.database import get_db
+from app.api.deps import get_legacy_excel_report_service
+from app.core.files import check_excel_upload, spool_upload, iter_file_and_unlink
+from app.core.http import SHARED_CACHE_CONTROL, version_etag, etag_matches, not_modified
 from app.core.security import verify_api_key
 from app.services.excel_report import ExcelReportService
 from app.schemas.excel_report import (
@@ -19,6 +20,9 @@ from app.schemas.excel_report import (
 
 router = APIRouter()
 
+# Validates and encodes a whole list in a single pydantic-core pass
+_report_list = TypeAdapter(List[ExcelTemplateReportListResponse])
+
 
 # ==================== Excel Template Report CRUD Endpoints ====================
 
@@ -27,60 +31,59 @@ router = APIRouter()
 async def list_excel_reports(
     include_archived: bool = False,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """Get all Excel template reports."""
-    service = ExcelReportService(db)
-    reports = await service.get_reports(include_archived)
-
-    # Convert to list response
-    return [
-        ExcelTemplateReportListResponse(
-            id=r.id,
-            name=r.name,
-            description=r.description,
-            template_filename=r.template_filename,
-            placeholder_count=len(r.placeholders) if r.placeholders else 0,
-            mapped_count=len(r.mappings) if r.mappings else 0,
-            is_public=r.is_public,
-            is_archived=r.is_archived,
-            created_at=r.created_at,
-            updated_at=r.updated_at,
-        )
-        for r in reports
-    ]
+    rows = await service.get_report_summaries(include_archived)
+    return Response(
+        _report_list.dump_json(_report_list.validate_python(rows, from_attributes=True)),
+        media_type="application/json",
+    )
 
 
 @router.get("/{report_id}", response_model=ExcelTemplateReportResponse)
 async def get_excel_report(
     report_id: int,
+    request: Request,
+    response: Response,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """Get a single Excel template report by ID."""
-    service = ExcelReportService(db)
     report = await service.get_report(report_id)
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Excel report not found",
         )
+
+    etag = version_etag(report.id, report.updated_at or report.created_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
     return report
 
 
 @router.get("/shared/{share_token}", response_model=ExcelTemplateReportResponse)
 async def get_shared_excel_report(
     share_token: str,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """Get a shared Excel template report by token (no authentication required)."""
-    service = ExcelReportService(db)
     report = await service.get_report_by_share_token(share_token)
     if not report:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Excel report not found or not shared",
         )
+
+    etag = version_etag(report.id, report.updated_at or report.created_at)
+    if etag_matches(request, etag):
+        return not_modified(etag, SHARED_CACHE_CONTROL)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = SHARED_CACHE_CONTROL
     return report
 
 
@@ -88,10 +91,9 @@ async def get_shared_excel_report(
 async def create_excel_report(
     data: ExcelTemplateReportCreate,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """Create a new Excel template report."""
-    service = ExcelReportService(db)
     report = await service.create_report(data)
     return report
 
@@ -101,10 +103,9 @@ async def update_excel_report(
     report_id: int,
     data: ExcelTemplateReportUpdate,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """Update an Excel template report."""
-    service = ExcelReportService(db)
     report = await service.update_report(report_id, data)
     if not report:
         raise HTTPException(
@@ -118,10 +119,9 @@ async def update_excel_report(
 async def delete_excel_report(
     report_id: int,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """Delete an Excel template report."""
-    service = ExcelReportService(db)
     deleted = await service.delete_report(report_id)
     if not deleted:
         raise HTTPException(
@@ -138,7 +138,7 @@ async def upload_template(
     report_id: int,
     file: UploadFile = File(...),
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """
     Upload an Excel template file.
@@ -155,13 +155,14 @@ async def upload_template(
             detail="Only Excel files (.xlsx, .xls) are allowed",
         )
 
-    # Read file content
-    file_content = await file.read()
+    await check_excel_upload(file)
+
+    # Stream the upload into a spooled temp file instead of reading it whole
+    template_file = await spool_upload(file)
 
-    service = ExcelReportService(db)
     try:
         placeholders, filename = await service.upload_template(
-            report_id, file_content, file.filename
+            report_id, template_file, file.filename
         )
     except ValueError as e:
         raise HTTPException(
@@ -181,6 +182,8 @@ async def upload_template(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process template: {str(e)}",
         )
+    finally:
+        template_file.close()
 
     return TemplateUploadResponse(
         message="Template uploaded successfully",
@@ -197,10 +200,9 @@ async def update_mappings(
     report_id: int,
     data: PlaceholderMappingRequest,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """Update placeholder to data source mappings."""
-    service = ExcelReportService(db)
     report = await service.update_mappings(report_id, data.mappings)
     if not report:
         raise HTTPException(
@@ -217,7 +219,7 @@ async def update_mappings(
 async def generate_excel(
     report_id: int,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """
     Generate an Excel file from the template with filled data.
@@ -225,7 +227,6 @@ async def generate_excel(
     This endpoint fetches data for all mapped placeholders and fills them
     into the template, returning the generated Excel file.
     """
-    service = ExcelReportService(db)
     report = await service.get_report(report_id)
     if not report:
         raise HTTPException(
@@ -267,8 +268,11 @@ async def generate_excel(
         else:
             return []
 
+    # Fetch all mapped data up front so the fill loop is pure lookups
+    placeholder_rows = await service.fetch_placeholder_data(report, data_fetcher)
+
     try:
-        file_bytes, filename = await service.generate_excel(report_id, data_fetcher)
+        file_path, filename = await service.generate_excel(report_id, placeholder_rows)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -282,7 +286,7 @@ async def generate_excel(
 
     # Return as downloadable file
     return StreamingResponse(
-        io.BytesIO(file_bytes),
+        iter_file_and_unlink(file_path),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         headers={
             "Content-Disposition": f'attachment; filename="{filename}"'
@@ -293,15 +297,15 @@ async def generate_excel(
 @router.get("/{report_id}/preview")
 async def preview_excel(
     report_id: int,
+    response: Response,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """
     Preview the Excel template with sample data.
 
     Returns a preview with first 5 rows of data for each table placeholder.
     """
-    service = ExcelReportService(db)
     report = await service.get_report(report_id)
     if not report:
         raise HTTPException(
@@ -309,6 +313,9 @@ async def preview_excel(
             detail="Excel report not found",
         )
 
+    # Authenticated, so only the client may cache it, not shared proxies
+    response.headers["Cache-Control"] = "private, max-age=60"
+
     # Return placeholder information with preview capability
     return {
         "report_id": report.id,
@@ -327,10 +334,9 @@ async def preview_excel(
 async def share_excel_report(
     report_id: int,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """Generate a share link for an Excel template report."""
-    service = ExcelReportService(db)
     report = await service.generate_share_token(report_id)
     if not report:
         raise HTTPException(
@@ -349,10 +355,9 @@ async def share_excel_report(
 async def revoke_excel_share(
     report_id: int,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """Revoke sharing for an Excel template report."""
-    service = ExcelReportService(db)
     report = await service.revoke_share(report_id)
     if not report:
         raise HTTPException(
@@ -369,10 +374,9 @@ async def duplicate_excel_report(
     report_id: int,
     name: str = None,
     _api_key: str = Depends(verify_api_key),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_legacy_excel_report_service),
 ):
     """Duplicate an Excel template report."""
-    service = ExcelReportService(db)
     report = await service.duplicate_report(report_id, name)
     if not report:
         raise HTTPException(
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
-from fastapi.responses import StreamingResponse
+import logging
+import re
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Query
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict, Any
-from io import BytesIO
+from typing import List, Dict, Any, Optional
 
+from app.api.deps import get_excel_template_service, get_excel_template_report_service
 from app.core.database import get_db
+from app.core.files import check_excel_upload
+from app.core.http import SHARED_CACHE_CONTROL, UTCJSONResponse, version_etag, etag_matches, not_modified
 from app.core.security import verify_api_key
 from app.services.excel_template_service import ExcelTemplateService, ExcelReportService
 from app.services.visualization import VisualizationService
@@ -21,72 +27,115 @@ from app.schemas.excel_template import (
     ExcelReportShareResponse,
 )
 
+logger = logging.getLogger(__name__)
+
+# Characters not allowed in download filenames
+_SLUG_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
 router = APIRouter()
 
 
+def _report_response(report, structure: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Encode a stored report (plus its template structure) as an ExcelReportResponse.
+    The values come from our own database, so they are encoded without
+    validation; a structure read as raw JSON is spliced in without re-parsing.
+    """
+    body = orjson.dumps({
+        "id": report.id,
+        "name": report.name,
+        "description": report.description,
+        "template_id": report.template_id,
+        "structure": structure,
+        "sheet_data": report.sheet_data or {},
+        "data_sources": report.data_sources or [],
+        "is_public": report.is_public,
+        "share_token": report.share_token,
+        "is_archived": report.is_archived,
+        "created_at": report.created_at,
+        "updated_at": report.updated_at,
+    }, option=orjson.OPT_UTC_Z)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _template_response(template) -> Response:
+    """
+    Encode a stored template as an ExcelTemplateResponse in one orjson pass,
+    so a large parsed structure is not walked by pydantic first.
+    """
+    body = orjson.dumps({
+        "id": template.id,
+        "name": template.name,
+        "description": template.description,
+        "file_name": template.file_name,
+        "structure": template.structure or {},
+        "is_archived": template.is_archived,
+        "created_at": template.created_at,
+        "updated_at": template.updated_at,
+    }, option=orjson.OPT_UTC_Z)
+    return Response(body, media_type="application/json")
+
+
 # ============ Template Endpoints ============
 
 @router.get("/templates", response_model=List[ExcelTemplateListResponse])
 async def list_templates(
     include_archived: bool = Query(False),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelTemplateService = Depends(get_excel_template_service),
     _: str = Depends(verify_api_key)
 ):
     """List all Excel templates."""
-    service = ExcelTemplateService(db)
-    templates = await service.get_templates(include_archived=include_archived)
-    return templates
+    rows = await service.get_template_summaries(include_archived=include_archived)
+    # Plain rows are encoded as-is; returning a response skips response_model validation
+    return UTCJSONResponse([dict(row._mapping) for row in rows])
 
 
 @router.post("/templates", response_model=ExcelTemplateResponse)
 async def create_template(
     data: ExcelTemplateCreate,
-    db: AsyncSession = Depends(get_db),
+    service: ExcelTemplateService = Depends(get_excel_template_service),
     _: str = Depends(verify_api_key)
 ):
     """Create a new Excel template."""
-    service = ExcelTemplateService(db)
     template = await service.create_template(data)
-    return template
+    return _template_response(template)
 
 
 @router.get("/templates/{template_id}", response_model=ExcelTemplateResponse)
 async def get_template(
     template_id: int,
-    db: AsyncSession = Depends(get_db),
+    service: ExcelTemplateService = Depends(get_excel_template_service),
     _: str = Depends(verify_api_key)
 ):
     """Get a single Excel template by ID."""
-    service = ExcelTemplateService(db)
-    template = await service.get_template(template_id)
-    if not template:
+    row = await service.get_template_row(template_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Template not found")
-    return template
+    # The structure is a raw JSON fragment and is embedded as-is
+    return UTCJSONResponse(dict(row._mapping))
 
 
 @router.put("/templates/{template_id}", response_model=ExcelTemplateResponse)
 async def update_template(
     template_id: int,
     data: ExcelTemplateUpdate,
-    db: AsyncSession = Depends(get_db),
+    service: ExcelTemplateService = Depends(get_excel_template_service),
     _: str = Depends(verify_api_key)
 ):
     """Update an Excel template."""
-    service = ExcelTemplateService(db)
     template = await service.update_template(template_id, data)
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
-    return template
+    return _template_response(template)
 
 
 @router.delete("/templates/{template_id}")
 async def delete_template(
     template_id: int,
-    db: AsyncSession = Depends(get_db),
+    service: ExcelTemplateService = Depends(get_excel_template_service),
     _: str = Depends(verify_api_key)
 ):
     """Delete an Excel template."""
-    service = ExcelTemplateService(db)
     success = await service.delete_template(template_id)
     if not success:
         raise HTTPException(status_code=404, detail="Template not found")
@@ -97,7 +146,7 @@ async def delete_template(
 async def upload_template_file(
     template_id: int,
     file: UploadFile = File(...),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelTemplateService = Depends(get_excel_template_service),
     _: str = Depends(verify_api_key)
 ):
     """Upload an Excel file for a template."""
@@ -107,19 +156,20 @@ async def upload_template_file(
             status_code=400,
             detail="Invalid file type. Only .xlsx and .xls files are allowed."
         )
+    await check_excel_upload(file)
 
-    service = ExcelTemplateService(db)
     try:
         template = await service.upload_template_file(template_id, file)
         if not template:
             raise HTTPException(status_code=404, detail="Template not found")
 
-        return TemplateUploadResponse(
-            message="Template uploaded and parsed successfully",
-            template_id=template.id,
-            file_name=template.file_name or "",
-            structure=template.structure or {}
-        )
+        # Encoded directly; the parsed structure can hold thousands of cells
+        return UTCJSONResponse({
+            "message": "Template uploaded and parsed successfully",
+            "template_id": template.id,
+            "file_name": template.file_name or "",
+            "structure": template.structure or {},
+        })
     except RuntimeError as e:
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
@@ -131,150 +181,83 @@ async def upload_template_file(
 @router.get("/reports", response_model=List[ExcelReportListResponse])
 async def list_reports(
     include_archived: bool = Query(False),
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_excel_template_report_service),
     _: str = Depends(verify_api_key)
 ):
     """List all Excel reports."""
-    service = ExcelReportService(db)
-    template_service = ExcelTemplateService(db)
-    reports = await service.get_reports(include_archived=include_archived)
-
-    # Add template names
-    result = []
-    for report in reports:
-        report_data = {
-            "id": report.id,
-            "name": report.name,
-            "description": report.description,
-            "template_id": report.template_id,
-            "template_name": None,
-            "is_public": report.is_public,
-            "is_archived": report.is_archived,
-            "created_at": report.created_at,
-            "updated_at": report.updated_at,
-        }
-        if report.template_id:
-            template = await template_service.get_template(report.template_id)
-            if template:
-                report_data["template_name"] = template.name
-        result.append(report_data)
-
-    return result
+    rows = await service.get_report_summaries(include_archived=include_archived)
+    return UTCJSONResponse([dict(row._mapping) for row in rows])
 
 
 @router.post("/reports", response_model=ExcelReportResponse)
 async def create_report(
     data: ExcelReportCreate,
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_excel_template_report_service),
+    template_service: ExcelTemplateService = Depends(get_excel_template_service),
     _: str = Depends(verify_api_key)
 ):
     """Create a new Excel report from template."""
     # Verify template exists
-    template_service = ExcelTemplateService(db)
     template = await template_service.get_template(data.template_id)
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
 
-    service = ExcelReportService(db)
     report = await service.create_report(data)
 
-    return ExcelReportResponse(
-        id=report.id,
-        name=report.name,
-        description=report.description,
-        template_id=report.template_id,
-        structure=template.structure,
-        sheet_data=report.sheet_data or {},
-        data_sources=report.data_sources or [],
-        is_public=report.is_public,
-        share_token=report.share_token,
-        is_archived=report.is_archived,
-        created_at=report.created_at,
-        updated_at=report.updated_at,
-    )
+    return _report_response(report, template.structure)
 
 
 @router.get("/reports/{report_id}", response_model=ExcelReportResponse)
 async def get_report(
     report_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    service: ExcelReportService = Depends(get_excel_template_report_service),
     _: str = Depends(verify_api_key)
 ):
     """Get a single Excel report by ID."""
-    service = ExcelReportService(db)
-    report = await service.get_report(report_id)
+    report = await service.get_report_row(report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    # Get template structure
-    structure = None
-    if report.template_id:
-        template_service = ExcelTemplateService(db)
-        template = await template_service.get_template(report.template_id)
-        if template:
-            structure = template.structure
-
-    return ExcelReportResponse(
-        id=report.id,
-        name=report.name,
-        description=report.description,
-        template_id=report.template_id,
-        structure=structure,
-        sheet_data=report.sheet_data or {},
-        data_sources=report.data_sources or [],
-        is_public=report.is_public,
-        share_token=report.share_token,
-        is_archived=report.is_archived,
-        created_at=report.created_at,
-        updated_at=report.updated_at,
+    # The response embeds the template structure, so its version counts too
+    etag = version_etag(
+        report.id,
+        report.updated_at or report.created_at,
+        report.joined_template_id,
+        report.template_version,
     )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Template structure comes back on the same row
+    return _report_response(report, report.structure, headers={"ETag": etag})
 
 
 @router.put("/reports/{report_id}", response_model=ExcelReportResponse)
 async def update_report(
     report_id: int,
     data: ExcelReportUpdate,
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_excel_template_report_service),
     _: str = Depends(verify_api_key)
 ):
     """Update an Excel report."""
-    service = ExcelReportService(db)
     report = await service.update_report(report_id, data)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    # Get template structure
-    structure = None
-    if report.template_id:
-        template_service = ExcelTemplateService(db)
-        template = await template_service.get_template(report.template_id)
-        if template:
-            structure = template.structure
-
-    return ExcelReportResponse(
-        id=report.id,
-        name=report.name,
-        description=report.description,
-        template_id=report.template_id,
-        structure=structure,
-        sheet_data=report.sheet_data or {},
-        data_sources=report.data_sources or [],
-        is_public=report.is_public,
-        share_token=report.share_token,
-        is_archived=report.is_archived,
-        created_at=report.created_at,
-        updated_at=report.updated_at,
-    )
+    # Template is loaded with the report
+    structure = report.template.structure if report.template else None
+
+    return _report_response(report, structure)
 
 
 @router.delete("/reports/{report_id}")
 async def delete_report(
     report_id: int,
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_excel_template_report_service),
     _: str = Depends(verify_api_key)
 ):
     """Delete an Excel report."""
-    service = ExcelReportService(db)
     success = await service.delete_report(report_id)
     if not success:
         raise HTTPException(status_code=404, detail="Report not found")
@@ -284,11 +267,10 @@ async def delete_report(
 @router.post("/reports/{report_id}/share", response_model=ExcelReportShareResponse)
 async def share_report(
     report_id: int,
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_excel_template_report_service),
     _: str = Depends(verify_api_key)
 ):
     """Generate or regenerate a share link for a report."""
-    service = ExcelReportService(db)
     report = await service.generate_share_token(report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
@@ -303,11 +285,10 @@ async def share_report(
 @router.delete("/reports/{report_id}/share")
 async def revoke_report_share(
     report_id: int,
-    db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_excel_template_report_service),
     _: str = Depends(verify_api_key)
 ):
     """Revoke sharing for a report."""
-    service = ExcelReportService(db)
     report = await service.revoke_share(report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
@@ -318,6 +299,7 @@ async def revoke_report_share(
 async def download_report(
     report_id: int,
     db: AsyncSession = Depends(get_db),
+    service: ExcelReportService = Depends(get_excel_template_report_service),
     _: str = Depends(verify_api_key)
 ):
     """Download Excel report with data filled in.
@@ -326,85 +308,62 @@ async def download_report(
     clauses from the underlying queries. This ensures exports contain
     complete data, not just preview rows.
     """
-    import logging
-    logger = logging.getLogger(__name__)
-
-    service = ExcelReportService(db)
     report = await service.get_report(report_id)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found")
 
-    logger.info(f"Downloading report {report_id}: {report.name}")
-    logger.info(f"Data sources: {report.data_sources}")
+    logger.info("Downloading report %s: %s", report_id, report.name)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Data sources: %s", report.data_sources)
 
     # Get visualization data for all data sources
     # Use remove_limit=True to get ALL rows, not just preview rows
     visualization_data: Dict[int, List[Dict[str, Any]]] = {}
     if report.data_sources:
         viz_service = VisualizationService(db)
-        for ds in report.data_sources:
-            viz_id = ds.get("visualization_id")
-            if viz_id:
-                try:
-                    logger.info(f"Fetching ALL data for visualization {viz_id} (no limit)")
-                    # remove_limit=True removes LIMIT clause to get all rows for export
-                    data = await viz_service.execute_visualization(viz_id, remove_limit=True)
-                    if data and "rows" in data:
-                        visualization_data[viz_id] = data["rows"]
-                        logger.info(f"Got {len(data['rows'])} rows for viz {viz_id}")
-                    else:
-                        logger.warning(f"No data returned for visualization {viz_id}")
-                except Exception as e:
-                    logger.error(f"Error fetching visualization {viz_id}: {e}")
-
-    logger.info(f"Visualization data keys: {list(visualization_data.keys())}")
+        viz_ids = list(dict.fromkeys(
+            ds.get("visualization_id") for ds in report.data_sources if ds.get("visualization_id")
+        ))
+        logger.info("Fetching ALL data for visualizations %s (no limit)", viz_ids)
+        # remove_limit=True removes LIMIT clause to get all rows for export
+        results = await viz_service.execute_visualizations(viz_ids, remove_limit=True)
+        for viz_id, data in results.items():
+            if data and "rows" in data:
+                visualization_data[viz_id] = data["rows"]
+                logger.info("Got %d rows for viz %s", len(data["rows"]), viz_id)
+            else:
+                logger.warning("No data returned for visualization %s", viz_id)
+
+    logger.debug("Visualization data keys: %s", list(visualization_data))
 
     try:
-        excel_bytes = await service.generate_excel(report_id, visualization_data)
-        if not excel_bytes:
+        excel_path = await service.generate_excel(report_id, visualization_data)
+        if not excel_path:
             raise HTTPException(status_code=500, detail="Failed to generate Excel file")
 
-        filename = f"{report.name.replace(' ', '_')}.xlsx"
-        return StreamingResponse(
-            BytesIO(excel_bytes),
+        filename = _SLUG_RE.sub("_", report.name) + ".xlsx"
+        # The export is cached on disk, so serve it as a plain file
+        return FileResponse(
+            excel_path,
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+            filename=filename,
         )
     except RuntimeError as e:
-        logger.error(f"Error generating Excel: {e}")
+        logger.error("Error generating Excel: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/reports/shared/{share_token}", response_model=ExcelReportResponse)
 async def get_shared_report(
     share_token: str,
-    db: AsyncSession = Depends(get_db)
+    service: ExcelReportService = Depends(get_excel_template_report_service)
 ):
     """Get a public shared report by share token."""
-    service = ExcelReportService(db)
     report = await service.get_report_by_share_token(share_token)
     if not report:
         raise HTTPException(status_code=404, detail="Report not found or not public")
 
-    # Get template structure
-    structure = None
-    if report.template_id:
-        template_service = ExcelTemplateService(db)
-        template = await template_service.get_template(report.template_id)
-        if template:
-            structure = template.structure
-
-    return ExcelReportResponse(
-        id=report.id,
-        name=report.name,
-        description=report.description,
-        template_id=report.template_id,
-        structure=structure,
-        sheet_data=report.sheet_data or {},
-        data_sources=report.data_sources or [],
-        is_public=report.is_public,
-        share_token=report.share_token,
-        is_archived=report.is_archived,
-        created_at=report.created_at,
-        updated_at=report.updated_at,
+    # Template structure comes back on the same row
+    return _report_response(
+        report, report.structure, headers={"Cache-Control": SHARED_CACHE_CONTROL}
     )
@@ -1,6 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Dict, Any, List, Optional
+import functools
 
+import httpx
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Any, List, Optional
+
+from app.api.deps import get_metabase_service
 from app.core.security import verify_api_key
 from app.services.metabase import MetabaseService
 from app.schemas.metabase import (
@@ -8,28 +13,62 @@ from app.schemas.metabase import (
     MetabaseQuery,
     MetabaseQueryResult,
     MetabaseDatabaseCreate,
+    MetabaseDatabaseUpdate,
     MetabaseQuestionCreate,
+    MetabaseQuestionUpdate,
     MetabaseQuestion,
     MetabaseDashboardCreate,
     MetabaseDashboard,
     MetabaseDashcardCreate,
+    MetabaseCollectionCreate,
 )
 
 router = APIRouter()
 
+# Query results are relayed to the client 64 KB at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+
 
-def get_metabase_service() -> MetabaseService:
-    """Get Metabase service instance."""
-    return MetabaseService()
+async def _relay(upstream: httpx.Response) -> AsyncIterator[bytes]:
+    """Yield a Metabase response body as it arrives, closing it when done."""
+    try:
+        async for chunk in upstream.aiter_bytes(STREAM_CHUNK_SIZE):
+            yield chunk
+    finally:
+        await upstream.aclose()
+
+
+def map_errors(detail: str, status_code: int = status.HTTP_502_BAD_GATEWAY):
+    """
+    Turn unexpected errors raised by a route into an HTTPException with the
+    given status, prefixing the message with detail. HTTPExceptions pass through.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=status_code, detail=f"{detail}: {str(e)}")
+        return wrapper
+    return decorator
+
+
+def _stream_json(upstream: httpx.Response) -> StreamingResponse:
+    """Pass a Metabase JSON response through without decoding it."""
+    return StreamingResponse(_relay(upstream), media_type="application/json")
 
 
 # ==================== Health Check ====================
 
 
 @router.get("/health")
-async def metabase_health():
+async def metabase_health(
+    service: MetabaseService = Depends(get_metabase_service),
+):
     """Check if Metabase is accessible."""
-    service = get_metabase_service()
     is_healthy = await service.health_check()
     if not is_healthy:
         raise HTTPException(
@@ -43,441 +82,335 @@ async def metabase_health():
 
 
 @router.get("/databases", response_model=List[Dict[str, Any]])
+@map_errors("Failed to fetch databases from Metabase")
 async def list_databases(
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Get list of all databases from Metabase."""
-    service = get_metabase_service()
-    try:
-        databases = await service.get_databases()
-        return databases
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to fetch databases from Metabase: {str(e)}",
-        )
+    databases = await service.get_databases()
+    return databases
 
 
 @router.get("/databases/{database_id}")
+@map_errors("Failed to fetch database from Metabase")
 async def get_database(
     database_id: int,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Get single database details."""
-    service = get_metabase_service()
-    try:
-        database = await service.get_database(database_id)
-        return database
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to fetch database from Metabase: {str(e)}",
-        )
+    database = await service.get_database(database_id)
+    return database
 
 
 @router.get("/databases/{database_id}/metadata")
+@map_errors("Failed to fetch database metadata")
 async def get_database_metadata(
     database_id: int,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Get database metadata including tables and fields."""
-    service = get_metabase_service()
-    try:
-        metadata = await service.get_database_metadata(database_id)
-        return metadata
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to fetch database metadata: {str(e)}",
-        )
+    metadata = await service.get_database_metadata(database_id)
+    return metadata
 
 
 @router.post("/databases", status_code=status.HTTP_201_CREATED)
+@map_errors("Failed to create database in Metabase")
 async def create_database(
     data: MetabaseDatabaseCreate,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Create a new database connection in Metabase."""
-    service = get_metabase_service()
-    try:
-        database = await service.create_database(data.model_dump())
-        return database
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to create database in Metabase: {str(e)}",
-        )
+    database = await service.create_database(data.model_dump(exclude_none=True))
+    return database
 
 
 @router.put("/databases/{database_id}")
+@map_errors("Failed to update database in Metabase")
 async def update_database(
     database_id: int,
-    data: Dict[str, Any],
+    data: MetabaseDatabaseUpdate,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Update database connection in Metabase."""
-    service = get_metabase_service()
-    try:
-        database = await service.update_database(database_id, data)
-        return database
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to update database in Metabase: {str(e)}",
-        )
+    database = await service.update_database(database_id, data.model_dump(exclude_unset=True))
+    return database
 
 
 @router.delete("/databases/{database_id}", status_code=status.HTTP_204_NO_CONTENT)
+@map_errors("Failed to delete database in Metabase")
 async def delete_database(
     database_id: int,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Delete database connection in Metabase."""
-    service = get_metabase_service()
-    try:
-        await service.delete_database(database_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to delete database in Metabase: {str(e)}",
-        )
+    await service.delete_database(database_id)
 
 
 @router.post("/databases/{database_id}/sync")
+@map_errors("Failed to sync database schema")
 async def sync_database(
     database_id: int,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Trigger schema sync for a database."""
-    service = get_metabase_service()
-    try:
-        result = await service.sync_database_schema(database_id)
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to sync database schema: {str(e)}",
-        )
+    result = await service.sync_database_schema(database_id)
+    return result
+
+
+@router.post("/databases/sync-all", response_model=Dict[int, str])
+@map_errors("Failed to fetch databases from Metabase")
+async def sync_all_databases(
+    database_ids: Optional[List[int]] = Body(None),
+    _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
+):
+    """
+    Trigger schema sync for several databases at once (all when no ids are given).
+    Returns the per-database status instead of failing on the first error.
+    """
+    return await service.sync_databases(database_ids)
 
 
 @router.post("/databases/validate")
+@map_errors("Database validation failed")
 async def validate_database(
     data: MetabaseDatabaseCreate,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Test database connection without saving."""
-    service = get_metabase_service()
-    try:
-        result = await service.validate_database(data.model_dump())
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Database validation failed: {str(e)}",
-        )
+    result = await service.validate_database(data.model_dump(exclude_none=True))
+    return result
 
 
 # ==================== Query Endpoints ====================
 
 
 @router.post("/query")
+@map_errors("Query execution failed")
 async def execute_query(
     query: MetabaseQuery,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Execute a query against Metabase."""
-    service = get_metabase_service()
-    try:
-        result = await service.execute_query(query.model_dump(exclude_none=True))
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Query execution failed: {str(e)}",
-        )
+    upstream = await service.stream_query(query.model_dump(exclude_none=True))
+    return _stream_json(upstream)
 
 
 @router.post("/query/native")
+@map_errors("Query execution failed")
 async def execute_native_query(
     database_id: int,
     sql: str,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Execute a native SQL query."""
-    service = get_metabase_service()
-    try:
-        result = await service.execute_native_query(database_id, sql)
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Query execution failed: {str(e)}",
-        )
+    upstream = await service.stream_query(service.native_query(database_id, sql))
+    return _stream_json(upstream)
 
 
 # ==================== Question Endpoints ====================
 
 
 @router.get("/questions")
+@map_errors("Failed to fetch questions")
 async def list_questions(
     collection_id: Optional[int] = None,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Get list of questions from Metabase."""
-    service = get_metabase_service()
-    try:
-        questions = await service.get_questions(collection_id)
-        return questions
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to fetch questions: {str(e)}",
-        )
+    questions = await service.get_questions(collection_id)
+    return questions
 
 
 @router.get("/questions/{question_id}")
+@map_errors("Failed to fetch question")
 async def get_question(
     question_id: int,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Get single question details."""
-    service = get_metabase_service()
-    try:
-        question = await service.get_question(question_id)
-        return question
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to fetch question: {str(e)}",
-        )
+    question = await service.get_question(question_id)
+    return question
 
 
 @router.post("/questions", status_code=status.HTTP_201_CREATED)
+@map_errors("Failed to create question")
 async def create_question(
     data: MetabaseQuestionCreate,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Create a new question in Metabase."""
-    service = get_metabase_service()
-    try:
-        question = await service.create_question(data.model_dump())
-        return question
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to create question: {str(e)}",
-        )
+    question = await service.create_question(data.model_dump(exclude_none=True))
+    return question
 
 
 @router.put("/questions/{question_id}")
+@map_errors("Failed to update question")
 async def update_question(
     question_id: int,
-    data: Dict[str, Any],
+    data: MetabaseQuestionUpdate,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Update a question in Metabase."""
-    service = get_metabase_service()
-    try:
-        question = await service.update_question(question_id, data)
-        return question
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to update question: {str(e)}",
-        )
+    question = await service.update_question(question_id, data.model_dump(exclude_unset=True))
+    return question
 
 
 @router.delete("/questions/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
+@map_errors("Failed to delete question")
 async def delete_question(
     question_id: int,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Delete a question in Metabase."""
-    service = get_metabase_service()
-    try:
-        await service.delete_question(question_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to delete question: {str(e)}",
-        )
+    await service.delete_question(question_id)
 
 
 @router.post("/questions/{question_id}/execute")
+@map_errors("Failed to execute question")
 async def execute_question(
     question_id: int,
     params: Optional[Dict[str, Any]] = None,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Execute a saved question and get results."""
-    service = get_metabase_service()
-    try:
-        result = await service.execute_question(question_id, params)
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to execute question: {str(e)}",
-        )
+    upstream = await service.stream_question(question_id, params)
+    return _stream_json(upstream)
 
 
 # ==================== Metabase Dashboard Endpoints ====================
 
 
 @router.get("/mb-dashboards")
+@map_errors("Failed to fetch dashboards")
 async def list_metabase_dashboards(
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Get list of dashboards from Metabase."""
-    service = get_metabase_service()
-    try:
-        dashboards = await service.get_dashboards()
-        return dashboards
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to fetch dashboards: {str(e)}",
-        )
+    dashboards = await service.get_dashboards()
+    return dashboards
 
 
 @router.get("/mb-dashboards/{dashboard_id}")
+@map_errors("Failed to fetch dashboard")
 async def get_metabase_dashboard(
     dashboard_id: int,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Get single dashboard from Metabase."""
-    service = get_metabase_service()
-    try:
-        dashboard = await service.get_dashboard(dashboard_id)
-        return dashboard
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to fetch dashboard: {str(e)}",
-        )
+    dashboard = await service.get_dashboard(dashboard_id)
+    return dashboard
 
 
 @router.post("/mb-dashboards", status_code=status.HTTP_201_CREATED)
+@map_errors("Failed to create dashboard")
 async def create_metabase_dashboard(
     data: MetabaseDashboardCreate,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Create a new dashboard in Metabase."""
-    service = get_metabase_service()
-    try:
-        dashboard = await service.create_dashboard(data.model_dump())
-        return dashboard
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to create dashboard: {str(e)}",
-        )
+    dashboard = await service.create_dashboard(data.model_dump(exclude_none=True))
+    return dashboard
 
 
 @router.post("/mb-dashboards/{dashboard_id}/cards")
+@map_errors("Failed to add card to dashboard")
 async def add_card_to_metabase_dashboard(
     dashboard_id: int,
     data: MetabaseDashcardCreate,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Add a card to a Metabase dashboard."""
-    service = get_metabase_service()
-    try:
-        result = await service.add_dashboard_card(dashboard_id, data.model_dump())
-        return result
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to add card to dashboard: {str(e)}",
-        )
+    result = await service.add_dashboard_card(dashboard_id, data.model_dump(exclude_none=True))
+    return result
 
 
 # ==================== Embedding Endpoints ====================
 
 
 @router.get("/embed/question/{question_id}/url")
+@map_errors("Failed to generate embed URL", status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 async def get_question_embed_url(
     question_id: int,
     theme: str = "light",
     bordered: bool = True,
     titled: bool = True,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Get embed URL for a question."""
-    service = get_metabase_service()
-    try:
-        url = service.get_embed_url(
-            resource_type="question",
-            resource_id=question_id,
-            theme=theme,
-            bordered=bordered,
-            titled=titled,
-        )
-        return {"embed_url": url}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate embed URL: {str(e)}",
-        )
+    url = service.get_embed_url(
+        resource_type="question",
+        resource_id=question_id,
+        theme=theme,
+        bordered=bordered,
+        titled=titled,
+    )
+    return {"embed_url": url}
 
 
 @router.get("/embed/dashboard/{dashboard_id}/url")
+@map_errors("Failed to generate embed URL", status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 async def get_dashboard_embed_url(
     dashboard_id: int,
     theme: str = "light",
     bordered: bool = True,
     titled: bool = True,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Get embed URL for a dashboard."""
-    service = get_metabase_service()
-    try:
-        url = service.get_embed_url(
-            resource_type="dashboard",
-            resource_id=dashboard_id,
-            theme=theme,
-            bordered=bordered,
-            titled=titled,
-        )
-        return {"embed_url": url}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to generate embed URL: {str(e)}",
-        )
+    url = service.get_embed_url(
+        resource_type="dashboard",
+        resource_id=dashboard_id,
+        theme=theme,
+        bordered=bordered,
+        titled=titled,
+    )
+    return {"embed_url": url}
 
 
 # ==================== Collections ====================
 
 
 @router.get("/collections")
+@map_errors("Failed to fetch collections")
 async def list_collections(
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Get list of collections from Metabase."""
-    service = get_metabase_service()
-    try:
-        collections = await service.get_collections()
-        return collections
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to fetch collections: {str(e)}",
-        )
+    collections = await service.get_collections()
+    return collections
 
 
 @router.post("/collections", status_code=status.HTTP_201_CREATED)
+@map_errors("Failed to create collection")
 async def create_collection(
-    data: Dict[str, Any],
+    data: MetabaseCollectionCreate,
     _api_key: str = Depends(verify_api_key),
+    service: MetabaseService = Depends(get_metabase_service),
 ):
     """Create a new collection in Metabase."""
-    service = get_metabase_service()
-    try:
-        collection = await service.create_collection(data)
-        return collection
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail=f"Failed to create collection: {str(e)}",
-        )
+    collection = await service.create_collection(data.model_dump(exclude_unset=True))
+    return collection
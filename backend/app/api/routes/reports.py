@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 import io
 
 from app.core.database import get_db
+from app.core.http import SHARED_CACHE_CONTROL, UTCJSONResponse, version_etag, etag_matches, not_modified
 from app.core.security import verify_api_key
 from app.services.report import ReportService
 from app.schemas.report import (
@@ -30,22 +31,11 @@ async def list_reports(
 ):
     """Get all reports."""
     service = ReportService(db)
-    reports = await service.get_reports(include_archived)
-
-    # Convert to list response with block_count
-    return [
-        ReportListResponse(
-            id=r.id,
-            name=r.name,
-            description=r.description,
-            block_count=len(r.blocks) if r.blocks else 0,
-            is_public=r.is_public,
-            is_archived=r.is_archived,
-            created_at=r.created_at,
-            updated_at=r.updated_at,
-        )
-        for r in reports
-    ]
+    rows = await service.get_report_summaries(include_archived)
+
+    # Rows come straight from the database, so they are encoded as-is;
+    # returning a response skips response_model validation entirely
+    return UTCJSONResponse([dict(row._mapping) for row in rows])
 
 
 @router.get("/{report_id}", response_model=ReportResponse)
@@ -68,6 +58,8 @@ async def get_report(
 @router.get("/shared/{share_token}", response_model=ReportResponse)
 async def get_shared_report(
     share_token: str,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
     """Get a shared report by token (no authentication required)."""
@@ -78,6 +70,12 @@ async def get_shared_report(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Report not found or not shared",
         )
+
+    etag = version_etag(report.id, report.updated_at or report.created_at)
+    if etag_matches(request, etag):
+        return not_modified(etag, SHARED_CACHE_CONTROL)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = SHARED_CACHE_CONTROL
     return report
 
 
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 
+from app.core.cache import AsyncTTLCache
 from app.core.database import get_db
 from app.core.security import verify_api_key
-from app.services.visualization import VisualizationService
+from app.services.visualization import LockedFieldsError, VisualizationService
 from app.schemas.visualization import (
     VisualizationCreate,
     VisualizationUpdate,
@@ -15,6 +17,15 @@ from app.schemas.visualization import (
 
 router = APIRouter()
 
+# Serialized list/detail responses, keyed by ("list", include_archived) or
+# ("item", id). Every write in this module clears it; other workers may serve
+# a stale copy for up to the TTL.
+RESPONSE_CACHE_TTL_SECONDS = 15
+_response_cache = AsyncTTLCache(ttl=RESPONSE_CACHE_TTL_SECONDS, maxsize=512)
+
+# Validates and encodes a whole list in a single pydantic-core pass
+_visualization_list = TypeAdapter(List[VisualizationResponse])
+
 
 @router.get("", response_model=List[VisualizationResponse])
 async def list_visualizations(
@@ -24,8 +35,15 @@ async def list_visualizations(
 ):
     """Get all visualizations."""
     service = VisualizationService(db)
-    visualizations = await service.get_visualizations(include_archived)
-    return visualizations
+
+    async def load() -> bytes:
+        # Plain row dicts skip the ORM, but still go through the response schema
+        # so the list matches the detail endpoint field for field
+        rows = await service.get_visualization_rows(include_archived)
+        return _visualization_list.dump_json(_visualization_list.validate_python(rows))
+
+    body = await _response_cache.get_or_set(("list", include_archived), load)
+    return Response(body, media_type="application/json")
 
 
 @router.get("/{visualization_id}", response_model=VisualizationResponse)
@@ -36,13 +54,21 @@ async def get_visualization(
 ):
     """Get a single visualization by ID."""
     service = VisualizationService(db)
-    visualization = await service.get_visualization(visualization_id)
-    if not visualization:
+
+    async def load() -> Optional[bytes]:
+        visualization = await service.get_visualization(visualization_id)
+        if not visualization:
+            return None
+        return VisualizationResponse.model_validate(visualization).model_dump_json().encode()
+
+    # Misses (None) are not cached, so a new visualization shows up at once
+    body = await _response_cache.get_or_set(("item", visualization_id), load)
+    if body is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Visualization not found",
         )
-    return visualization
+    return Response(body, media_type="application/json")
 
 
 @router.get("/metabase/{metabase_question_id}", response_model=VisualizationResponse)
@@ -71,6 +97,7 @@ async def create_visualization(
     """Create a new visualization."""
     service = VisualizationService(db)
     visualization = await service.create_visualization(data)
+    _response_cache.invalidate()
     return visualization
 
 
@@ -89,28 +116,19 @@ async def update_visualization(
     native_query, mbql_query) cannot be modified.
     """
     service = VisualizationService(db)
-
-    # First, get the existing visualization to check lock status
-    existing = await service.get_visualization(visualization_id)
-    if not existing:
+    try:
+        visualization = await service.update_visualization(visualization_id, data)
+    except LockedFieldsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"{e}. Only appearance settings can be changed.",
+        )
+    if not visualization:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Visualization not found",
         )
-
-    # If query is locked, prevent modifications to query-related fields
-    if existing.is_query_locked:
-        query_fields = ['database_id', 'query_type', 'native_query', 'mbql_query', 'metabase_question_id']
-        update_data = data.model_dump(exclude_unset=True)
-
-        locked_field_updates = [f for f in query_fields if f in update_data and update_data[f] is not None]
-        if locked_field_updates:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Query is locked. Cannot modify: {', '.join(locked_field_updates)}. Only appearance settings can be changed.",
-            )
-
-    visualization = await service.update_visualization(visualization_id, data)
+    _response_cache.invalidate()
     return visualization
 
 
@@ -128,6 +146,7 @@ async def delete_visualization(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Visualization not found",
         )
+    _response_cache.invalidate()
 
 
 # ==================== Customization Endpoints ====================
@@ -141,17 +160,14 @@ async def get_customization(
 ):
     """Get customization for a visualization."""
     service = VisualizationService(db)
-
-    # Verify visualization exists
-    visualization = await service.get_visualization(visualization_id)
-    if not visualization:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Visualization not found",
-        )
-
     customization = await service.get_customization(visualization_id)
     if not customization:
+        # Only a miss needs the existence check to pick the right 404
+        if not await service.visualization_exists(visualization_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Visualization not found",
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Customization not found",
@@ -168,16 +184,13 @@ async def update_customization(
 ):
     """Update (or create) customization for a visualization."""
     service = VisualizationService(db)
-
-    # Verify visualization exists
-    visualization = await service.get_visualization(visualization_id)
-    if not visualization:
+    customization = await service.update_customization(visualization_id, data)
+    if not customization:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Visualization not found",
         )
-
-    customization = await service.update_customization(visualization_id, data)
+    _response_cache.invalidate()
     return customization
 
 
@@ -189,18 +202,15 @@ async def delete_customization(
 ):
     """Delete customization for a visualization (reset to defaults)."""
     service = VisualizationService(db)
-
-    # Verify visualization exists
-    visualization = await service.get_visualization(visualization_id)
-    if not visualization:
+    deleted = await service.delete_customization(visualization_id)
+    if deleted is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Visualization not found",
         )
-
-    deleted = await service.delete_customization(visualization_id)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Customization not found",
         )
+    _response_cache.invalidate()
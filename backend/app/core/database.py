@@ -1,13 +1,35 @@
+import orjson
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
 
+
+def _json_serializer(value) -> str:
+    """Encode JSON/JSONB parameters with orjson (non-string keys become strings, as with json)."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 # Async engine for FastAPI
 async_engine = create_async_engine(
     settings.DATABASE_URL,
-    echo=settings.DEBUG,
+    echo=settings.DB_ECHO,
     future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_timeout=30,
+    connect_args={
+        # Short metadata queries never benefit from JIT compilation
+        "server_settings": {"jit": "off"},
+        # Consumed by SQLAlchemy's asyncpg adapter, which keeps an LRU of
+        # server-side prepared statements on each connection (default 100)
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    },
+    # The asyncpg dialect installs its json/jsonb codecs with these on every
+    # new connection, so column values are decoded by orjson instead of json
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
 AsyncSessionLocal = async_sessionmaker(
@@ -16,7 +38,8 @@ AsyncSessionLocal = async_sessionmaker(
     expire_on_commit=False,
 )
 
-Base = declarative_base()
+class Base(DeclarativeBase):
+    """Declarative base for all ORM models."""
 
 
 async def get_db() -> AsyncSession:
@@ -0,0 +1,86 @@
+import contextlib
+import hashlib
+import os
+import tempfile
+from typing import IO, AsyncIterator, Optional
+
+import anyio
+from fastapi import HTTPException, UploadFile, status
+
+from app.core.config import settings
+
+
+# Read uploads 1 MB at a time; anything above 8 MB spills to a temp file on disk
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+# Leading bytes of .xlsx (zip container) and .xls (OLE2 compound file)
+EXCEL_SIGNATURES = (b"PK\x03\x04", b"\xd0\xcf\x11\xe0")
+
+
+async def check_excel_upload(file: UploadFile) -> None:
+    """
+    Reject oversized or non-Excel uploads before they are copied or parsed.
+    Only the first few bytes are read; the file is rewound afterwards.
+    """
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE // (1024 * 1024)} MB",
+        )
+
+    head = await file.read(8)
+    await file.seek(0)
+    if not head.startswith(EXCEL_SIGNATURES):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File content is not a valid Excel workbook",
+        )
+
+
+async def spool_upload(file: UploadFile) -> IO[bytes]:
+    """
+    Copy an upload into a spooled temporary file in fixed-size chunks.
+    The returned file is rewound and should be closed by the caller.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
+
+async def save_upload(file: UploadFile, path: str) -> str:
+    """
+    Write an upload to path in fixed-size chunks.
+    Returns a hex digest of the content, usable as a cache key.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    async with await anyio.open_file(path, "wb") as f:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            await f.write(chunk)
+    return digest.hexdigest()
+
+
+# Generated files are streamed back 64 KB at a time
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def make_temp_path(suffix: str = "", dir: Optional[str] = None) -> str:
+    """Create an empty temporary file (optionally inside dir) and return its path."""
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=dir)
+    os.close(fd)
+    return path
+
+
+async def iter_file_and_unlink(path: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield a file in chunks without blocking the event loop, then delete it."""
+    try:
+        async with await anyio.open_file(path, "rb") as f:
+            while chunk := await f.read(chunk_size):
+                yield chunk
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
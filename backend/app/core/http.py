@@ -0,0 +1,166 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+import orjson
+from fastapi import Request, Response, status
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# Share-token reads are public and change rarely; let browsers and CDNs reuse
+# them briefly and revalidate in the background
+SHARED_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+
+class UTCJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse that writes UTC timestamps with a "Z" suffix, the way
+    pydantic does, so rows encoded directly match response_model output.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z,
+        )
+
+def version_etag(*parts: object) -> str:
+    """
+    Build a weak ETag from version markers (ids, timestamps).
+    Datetimes are encoded to the microsecond so back-to-back edits differ.
+    """
+    tokens = []
+    for part in parts:
+        if isinstance(part, datetime):
+            part = int(part.timestamp() * 1_000_000)
+        tokens.append("" if part is None else str(part))
+    return f'W/"{"-".join(tokens)}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag."""
+    return _if_none_match(request.headers.get("if-none-match"), etag)
+
+
+def _if_none_match(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored on both sides
+    wanted = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == wanted
+        for candidate in if_none_match.split(",")
+    )
+
+
+def not_modified(etag: str, cache_control: Optional[str] = None) -> Response:
+    """Build an empty 304 response carrying the current ETag."""
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+class ETagMiddleware:
+    """
+    Tag JSON GET responses under the given path prefixes with a hash of their
+    body, and answer a matching If-None-Match with an empty 304.
+
+    The handler still runs, but unchanged responses skip the transfer. Routes
+    that set their own ETag (from version markers) are passed through as-is.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefixes: Iterable[str]):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or not scope["path"].startswith(self.path_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] == status.HTTP_200_OK
+                    and "etag" not in headers
+                    and headers.get("content-type", "").startswith("application/json")
+                ):
+                    # Hold the start message until the whole body is hashed
+                    start = message
+                    return
+            elif message["type"] == "http.response.body" and start is not None:
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+
+                body = b"".join(chunks)
+                # Weak: the hash is of the uncompressed body, and the gzip layer
+                # above may re-encode it, so it must not claim byte equality
+                etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+                headers = MutableHeaders(raw=list(start["headers"]))
+                headers["ETag"] = etag
+                if _if_none_match(if_none_match, etag):
+                    del headers["content-length"]
+                    del headers["content-type"]
+                    await send({
+                        "type": "http.response.start",
+                        "status": status.HTTP_304_NOT_MODIFIED,
+                        "headers": headers.raw,
+                    })
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+
+                await send({**start, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": body})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+
+# Only text-like bodies are worth compressing; xlsx downloads are zip files already
+COMPRESSIBLE_CONTENT_TYPES = ("application/json", "text/")
+
+
+class _TextGZipResponder(GZipResponder):
+    """GZipResponder that passes through responses whose content type is not compressible."""
+
+    async def send_with_gzip(self, message: Message) -> None:
+        await super().send_with_gzip(message)
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            if not content_type.startswith(COMPRESSIBLE_CONTENT_TYPES):
+                # The base responder forwards bodies untouched once it thinks
+                # an encoding is already set
+                self.content_encoding_set = True
+
+
+class TextGZipMiddleware(GZipMiddleware):
+    """
+    Gzip JSON and text responses for clients that accept it, leaving binary
+    downloads alone. Streaming responses are compressed chunk by chunk.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("accept-encoding", ""):
+            responder = _TextGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
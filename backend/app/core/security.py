@@ -1,3 +1,5 @@
+import hmac
+
 from fastapi import HTTPException, status, Depends, Security
 from fastapi.security import APIKeyHeader
 
@@ -6,6 +8,9 @@ from app.core.config import settings
 # API Key authentication
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
+# Encoded once; every request compares against these bytes
+_EXPECTED_API_KEY = settings.API_KEY.encode()
+
 
 async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
     """Verify the API key from request header."""
@@ -16,7 +21,8 @@ async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
             headers={"WWW-Authenticate": "API-Key"},
         )
 
-    if api_key != settings.API_KEY:
+    # Constant-time comparison so response timing doesn't leak the key
+    if not hmac.compare_digest(api_key.encode(), _EXPECTED_API_KEY):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid API key",
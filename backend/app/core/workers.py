@@ -0,0 +1,38 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+
+# Process pool for CPU-bound rendering (openpyxl parse/fill), so a large
+# workbook cannot stall the event loop. Workers are spawned rather than forked
+# because the parent runs threads (event loop, DB driver) that fork can't copy.
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Get the shared render pool, creating it on first use."""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(
+            max_workers=settings.RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _render_pool
+
+
+async def run_in_render_pool(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a module-level function in the render pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_render_pool(), partial(func, *args, **kwargs))
+
+
+def shutdown_render_pool() -> None:
+    """Shut down the render pool (called on application shutdown)."""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(cancel_futures=True)
+        _render_pool = None
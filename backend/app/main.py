@@ -4,7 +4,12 @@ from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.database import init_db
-from app.api.routes import api_router
+from app.core.http import ETagMiddleware, TextGZipMiddleware, UTCJSONResponse
+from app.core.http_client import close_http_client
+from app.core.workers import shutdown_render_pool
+from app.api.routes import build_api_router
+from app.services.ai_sql import AISQLService
+from app.services.metabase import MetabaseService
 
 
 @asynccontextmanager
@@ -12,9 +17,12 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
     await init_db()
+    app.state.metabase = MetabaseService()
+    app.state.ai_sql = AISQLService()
     yield
     # Shutdown
-    pass
+    await close_http_client()
+    shutdown_render_pool()
 
 
 app = FastAPI(
@@ -22,9 +30,19 @@ app = FastAPI(
     description="Custom Analytics Platform API - Uses Metabase as backend engine",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=UTCJSONResponse,
 )
 
-# Configure CORS
+# Conditional GETs for read-mostly endpoints that have no version markers
+app.add_middleware(
+    ETagMiddleware,
+    path_prefixes=("/api/v1/metabase", "/api/v1/reports", "/api/v1/visualizations"),
+)
+
+# Compress JSON bodies; wraps the ETag layer so ETags hash the plain body
+app.add_middleware(TextGZipMiddleware, minimum_size=1024, compresslevel=6)
+
+# Configure CORS (added last so it also wraps 304 responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
@@ -34,7 +52,7 @@ app.add_middleware(
 )
 
 # Include API routes
-app.include_router(api_router, prefix="/api/v1")
+app.include_router(build_api_router(), prefix="/api/v1")
 
 
 @app.get("/")
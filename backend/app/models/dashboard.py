@@ -1,10 +1,40 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Text
+import copy
+
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
 
 
+# Grid defaults for new dashboards. Column defaults deep-copy these so
+# rows never share (and mutate) one dict.
+DEFAULT_LAYOUT_CONFIG = {
+    "columns": 12,
+    "row_height": 80,
+    "margin": [10, 10],
+    "container_padding": [10, 10],
+    "breakpoints": {
+        "lg": 1200,
+        "md": 996,
+        "sm": 768,
+        "xs": 480
+    }
+}
+
+
+# Card styling defaults for new dashboard cards
+DEFAULT_CARD_STYLING = {
+    "border_radius": 8,
+    "border_color": "#e0e0e0",
+    "border_width": 1,
+    "shadow": "sm",
+    "background_color": "#ffffff",
+    "padding": 16
+}
+
+
 class Dashboard(Base):
     """
     Dashboard metadata - stores UI layout information that Metabase doesn't manage.
@@ -20,18 +50,7 @@ class Dashboard(Base):
     metabase_dashboard_id = Column(Integer, nullable=True, index=True)
 
     # Layout configuration (grid system, breakpoints)
-    layout_config = Column(JSON, default={
-        "columns": 12,
-        "row_height": 80,
-        "margin": [10, 10],
-        "container_padding": [10, 10],
-        "breakpoints": {
-            "lg": 1200,
-            "md": 996,
-            "sm": 768,
-            "xs": 480
-        }
-    })
+    layout_config = Column(JSONB, default=lambda: copy.deepcopy(DEFAULT_LAYOUT_CONFIG))
 
     # UI customizations
     theme = Column(String(50), default="light")
@@ -39,7 +58,7 @@ class Dashboard(Base):
     background_color = Column(String(20), default="#ffffff")
 
     # Global filters config
-    global_filters = Column(JSON, default=[])
+    global_filters = Column(JSONB, default=list)
 
     # Sharing settings
     is_public = Column(Boolean, default=False)
@@ -78,27 +97,20 @@ class DashboardCard(Base):
     height = Column(Integer, default=3)
 
     # Responsive layouts (stored as JSON for each breakpoint)
-    responsive_layouts = Column(JSON, default={})
+    responsive_layouts = Column(JSONB, default=dict)
 
     # Layering
     z_index = Column(Integer, default=0)
 
     # Card-specific styling
-    custom_styling = Column(JSON, default={
-        "border_radius": 8,
-        "border_color": "#e0e0e0",
-        "border_width": 1,
-        "shadow": "sm",
-        "background_color": "#ffffff",
-        "padding": 16
-    })
+    custom_styling = Column(JSONB, default=lambda: copy.deepcopy(DEFAULT_CARD_STYLING))
 
     # Card title override (optional)
     title_override = Column(String(255), nullable=True)
     show_title = Column(Boolean, default=True)
 
     # Filter parameter mapping
-    filter_mappings = Column(JSON, default=[])
+    filter_mappings = Column(JSONB, default=list)
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -124,10 +136,10 @@ class DashboardFilter(Base):
     filter_type = Column(String(50), nullable=False)  # text, number, date, dropdown
 
     # Default value
-    default_value = Column(JSON, nullable=True)
+    default_value = Column(JSONB, nullable=True)
 
     # For dropdown filters - list of options
-    options = Column(JSON, default=[])
+    options = Column(JSONB, default=list)
     options_query_id = Column(Integer, nullable=True)  # Metabase question ID for dynamic options
 
     # UI settings
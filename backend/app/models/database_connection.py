@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, JSON, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
 from app.core.database import Base
@@ -20,17 +21,17 @@ class DatabaseConnectionMetadata(Base):
     custom_name = Column(String(255), nullable=True)
     description = Column(Text, nullable=True)
     category = Column(String(100), nullable=True)  # production, staging, analytics, etc.
-    tags = Column(JSON, default=[])
+    tags = Column(JSONB, default=list)
 
     # Custom schema documentation
-    schema_documentation = Column(JSON, default={})
+    schema_documentation = Column(JSONB, default=dict)
 
     # Table relationships (joins) documentation
-    relationships = Column(JSON, default=[])
+    relationships = Column(JSONB, default=list)
 
     # Access control metadata
     access_level = Column(String(50), default="private")  # public, private, restricted
-    allowed_users = Column(JSON, default=[])
+    allowed_users = Column(JSONB, default=list)
 
     # Sync settings
     auto_sync = Column(Boolean, default=True)
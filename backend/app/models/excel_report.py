@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-import uuid
+import secrets
 
 from app.core.database import Base
 
@@ -18,6 +19,8 @@ class ExcelTemplateReport(Base):
     4. Generate filled Excel files
     """
     __tablename__ = "excel_template_reports"
+    # Fetch created_at/updated_at via RETURNING so writes need no refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -25,6 +28,7 @@ class ExcelTemplateReport(Base):
 
     # Reference to saved template (new approach)
     template_id = Column(Integer, ForeignKey('excel_templates.id'), nullable=True)
+    template = relationship("ExcelTemplate")
 
     # Template file storage (legacy - for direct uploads)
     template_file_path = Column(String(500), nullable=True)  # Path to stored template
@@ -32,19 +36,19 @@ class ExcelTemplateReport(Base):
 
     # Detected placeholders from template (legacy)
     # Array of: { id, placeholder, type, sheet_name, cell_reference }
-    placeholders = Column(JSON, default=[])
+    placeholders = Column(JSONB, default=list)
 
     # Placeholder to data source mappings (legacy)
     # Object: { placeholder_id: { type, source_id, query, database_id } }
-    mappings = Column(JSON, default={})
+    mappings = Column(JSONB, default=dict)
 
     # Sheet modifications (new approach)
     # Structure: {sheets: [{name, cells: {A1: {value, style}, ...}}]}
-    sheet_data = Column(JSON, default={})
+    sheet_data = Column(JSONB, default=dict)
 
     # Data source mappings (new approach)
     # Array of: [{id, visualization_id, sheet_name, start_cell, columns, include_header}]
-    data_sources = Column(JSON, default=[])
+    data_sources = Column(JSONB, default=list)
 
     # Sharing
     is_public = Column(Boolean, default=False)
@@ -57,5 +61,5 @@ class ExcelTemplateReport(Base):
 
     def generate_share_token(self):
         """Generate a unique share token for the report."""
-        self.share_token = str(uuid.uuid4()).replace('-', '')[:32]
+        self.share_token = secrets.token_hex(16)
         return self.share_token
@@ -1,13 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.models.types import CompressedJSON
 
 
 class ExcelTemplate(Base):
     """
     Excel Template model - stores uploaded Excel templates.
-    Templates are parsed and their structure is stored as JSON
+    Templates are parsed and their structure is stored as compressed JSON
     for rendering in the frontend grid.
     """
     __tablename__ = "excel_templates"
@@ -30,7 +31,8 @@ class ExcelTemplate(Base):
     #     rowHeights: {0: 25, 1: 30, ...}
     #   }]
     # }
-    structure = Column(JSON, default={})
+    # Stored zlib-compressed; the per-cell style maps compress very well
+    structure = Column(CompressedJSON, default=dict)
 
     # Metadata
     is_archived = Column(Boolean, default=False)
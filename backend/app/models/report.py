@@ -1,10 +1,25 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
-import uuid
+import copy
+import secrets
 
 from app.core.database import Base
 
 
+# Page settings for new reports, deep-copied into each row
+DEFAULT_PAGE_SETTINGS = {
+    "page_size": "A4",
+    "orientation": "portrait",
+    "margins": {
+        "top": 20,
+        "right": 20,
+        "bottom": 20,
+        "left": 20
+    }
+}
+
+
 class Report(Base):
     """
     Report model - stores report metadata and block configuration.
@@ -20,23 +35,14 @@ class Report(Base):
     # Report content - array of blocks (legacy)
     # Each block: { id, type, order, config }
     # Types: 'text', 'visualization', 'table', 'divider'
-    blocks = Column(JSON, default=[])
+    blocks = Column(JSONB, default=list)
 
     # New ReportBro-style elements (new designer)
     # Each element: { id, type, name, section, position, locked, visible, config }
-    elements = Column(JSON, default=[])
+    elements = Column(JSONB, default=list)
 
     # Page settings
-    settings = Column(JSON, default={
-        "page_size": "A4",
-        "orientation": "portrait",
-        "margins": {
-            "top": 20,
-            "right": 20,
-            "bottom": 20,
-            "left": 20
-        }
-    })
+    settings = Column(JSONB, default=lambda: copy.deepcopy(DEFAULT_PAGE_SETTINGS))
 
     # Sharing
     is_public = Column(Boolean, default=False)
@@ -49,5 +55,5 @@ class Report(Base):
 
     def generate_share_token(self):
         """Generate a unique share token for the report."""
-        self.share_token = str(uuid.uuid4()).replace('-', '')[:32]
+        self.share_token = secrets.token_hex(16)
         return self.share_token
@@ -0,0 +1,47 @@
+import zlib
+from typing import Any, Optional
+
+import orjson
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    JSON value stored as zlib-compressed bytes (bytea).
+
+    Meant for large, write-once documents that are only ever read back whole,
+    never queried inside Postgres.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, level: int = 6, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.level = level
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        # Non-string keys (e.g. column indexes) become strings, as with json
+        return zlib.compress(orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS), self.level)
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Any:
+        if value is None:
+            return None
+        return orjson.loads(zlib.decompress(value))
+
+
+class RawCompressedJSON(CompressedJSON):
+    """
+    Reads a CompressedJSON column back as its stored JSON text, wrapped in an
+    orjson.Fragment so it is embedded into a response without being parsed.
+    """
+
+    cache_ok = True
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Any:
+        if value is None:
+            return None
+        return orjson.Fragment(zlib.decompress(value))
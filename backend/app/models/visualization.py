@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.schemas.visualization import DEFAULT_CUSTOM_COLORS
 
 
 class Visualization(Base):
@@ -11,6 +13,8 @@ class Visualization(Base):
     Can be linked to a Metabase question or be fully custom.
     """
     __tablename__ = "visualizations"
+    # Fetch created_at/updated_at via RETURNING so writes need no refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -27,13 +31,13 @@ class Visualization(Base):
     native_query = Column(Text, nullable=True)
 
     # MBQL query (JSON format)
-    mbql_query = Column(JSON, nullable=True)
+    mbql_query = Column(JSONB, nullable=True)
 
     # Visualization type
     visualization_type = Column(String(50), default="table")  # table, bar, line, pie, area, etc.
 
     # Visualization settings (Metabase compatible)
-    visualization_settings = Column(JSON, default={})
+    visualization_settings = Column(JSONB, default=dict)
 
     # Metadata
     is_archived = Column(Boolean, default=False)
@@ -54,19 +58,18 @@ class VisualizationCustomization(Base):
     that go beyond what Metabase natively supports.
     """
     __tablename__ = "visualization_customizations"
+    # Fetch created_at/updated_at via RETURNING so writes need no refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     visualization_id = Column(Integer, ForeignKey("visualizations.id"), nullable=False, unique=True)
 
-    # Color customization
-    custom_colors = Column(JSON, default=[
-        "#509EE3", "#88BF4D", "#A989C5", "#EF8C8C",
-        "#F9D45C", "#F2A86F", "#98D9D9", "#7172AD"
-    ])
+    # Color customization; each row gets its own copy of the default palette
+    custom_colors = Column(JSONB, default=lambda: list(DEFAULT_CUSTOM_COLORS))
     color_palette_name = Column(String(50), default="default")
 
     # Label customization
-    custom_labels = Column(JSON, default={})
+    custom_labels = Column(JSONB, default=dict)
 
     # Axis customization
     x_axis_label = Column(String(255), nullable=True)
@@ -87,16 +90,16 @@ class VisualizationCustomization(Base):
     data_label_format = Column(String(50), nullable=True)
 
     # Goal/reference lines
-    goal_lines = Column(JSON, default=[])
-    reference_lines = Column(JSON, default=[])
+    goal_lines = Column(JSONB, default=list)
+    reference_lines = Column(JSONB, default=list)
 
     # Table specific
-    hidden_columns = Column(JSON, default=[])
-    column_order = Column(JSON, default=[])
-    column_widths = Column(JSON, default={})
+    hidden_columns = Column(JSONB, default=list)
+    column_order = Column(JSONB, default=list)
+    column_widths = Column(JSONB, default=dict)
 
     # Conditional formatting
-    conditional_formatting = Column(JSON, default=[])
+    conditional_formatting = Column(JSONB, default=list)
 
     # Animation
     enable_animations = Column(Boolean, default=True)
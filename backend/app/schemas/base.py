@@ -0,0 +1,7 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class ORMBase(BaseModel):
+    """Base for response schemas that are read from ORM objects and rows."""
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,20 +1,22 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from app.schemas.base import ORMBase
+
 
 # Layout configuration schema
 class LayoutConfig(BaseModel):
     columns: int = 12
     row_height: int = 80
-    margin: List[int] = [10, 10]
-    container_padding: List[int] = [10, 10]
-    breakpoints: Dict[str, int] = {
+    margin: List[int] = Field(default_factory=lambda: [10, 10])
+    container_padding: List[int] = Field(default_factory=lambda: [10, 10])
+    breakpoints: Dict[str, int] = Field(default_factory=lambda: {
         "lg": 1200,
         "md": 996,
         "sm": 768,
         "xs": 480
-    }
+    })
 
 
 # Card styling schema
@@ -39,8 +41,8 @@ class DashboardCardBase(BaseModel):
     custom_styling: Optional[CardStyling] = None
     title_override: Optional[str] = None
     show_title: bool = True
-    filter_mappings: List[Dict[str, Any]] = []
-    responsive_layouts: Dict[str, Any] = {}
+    filter_mappings: List[Dict[str, Any]] = Field(default_factory=list)
+    responsive_layouts: Dict[str, Any] = Field(default_factory=dict)
 
 
 class DashboardCardCreate(DashboardCardBase):
@@ -62,15 +64,12 @@ class DashboardCardUpdate(BaseModel):
     responsive_layouts: Optional[Dict[str, Any]] = None
 
 
-class DashboardCardResponse(DashboardCardBase):
+class DashboardCardResponse(DashboardCardBase, ORMBase):
     id: int
     dashboard_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 
 # Dashboard Filter schemas
 class DashboardFilterBase(BaseModel):
@@ -78,7 +77,7 @@ class DashboardFilterBase(BaseModel):
     display_name: str
     filter_type: str  # text, number, date, dropdown
     default_value: Optional[Any] = None
-    options: List[Any] = []
+    options: List[Any] = Field(default_factory=list)
     options_query_id: Optional[int] = None
     position: int = 0
     width: str = "auto"
@@ -103,15 +102,12 @@ class DashboardFilterUpdate(BaseModel):
     date_range_type: Optional[str] = None
 
 
-class DashboardFilterResponse(DashboardFilterBase):
+class DashboardFilterResponse(DashboardFilterBase, ORMBase):
     id: int
     dashboard_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 
 # Dashboard schemas
 class DashboardBase(BaseModel):
@@ -121,7 +117,7 @@ class DashboardBase(BaseModel):
     theme: str = "light"
     custom_css: Optional[str] = None
     background_color: str = "#ffffff"
-    global_filters: List[Dict[str, Any]] = []
+    global_filters: List[Dict[str, Any]] = Field(default_factory=list)
     is_public: bool = False
 
 
@@ -142,20 +138,26 @@ class DashboardUpdate(BaseModel):
     is_archived: Optional[bool] = None
 
 
-class DashboardResponse(DashboardBase):
+class DashboardResponse(DashboardBase, ORMBase):
     id: int
     metabase_dashboard_id: Optional[int] = None
     public_uuid: Optional[str] = None
     is_archived: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
-    cards: List[DashboardCardResponse] = []
-    filters: List[DashboardFilterResponse] = []
+    cards: List[DashboardCardResponse] = Field(default_factory=list)
+    filters: List[DashboardFilterResponse] = Field(default_factory=list)
 
-    class Config:
-        from_attributes = True
+
+# Bulk card update schemas
+class DashboardCardLayoutUpdate(BaseModel):
+    id: int
+    position_x: Optional[int] = None
+    position_y: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    z_index: Optional[int] = None
 
 
-# Bulk card update schema
 class BulkCardUpdate(BaseModel):
-    cards: List[Dict[str, Any]]  # List of {id, position_x, position_y, width, height}
+    cards: List[DashboardCardLayoutUpdate]
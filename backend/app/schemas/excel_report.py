@@ -1,21 +1,17 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Literal
 from datetime import datetime
-from enum import Enum
 
+from app.schemas.base import ORMBase
 
-class PlaceholderType(str, Enum):
-    """Types of placeholders that can be used in Excel templates."""
-    TABLE = "table"       # Full table data
-    VALUE = "value"       # Single value
-    CHART = "chart"       # Chart image
 
+# Types of placeholders that can be used in Excel templates:
+# table (full table data), value (single value), chart (chart image)
+PlaceholderType = Literal["table", "value", "chart"]
 
-class DataSourceType(str, Enum):
-    """Types of data sources for placeholders."""
-    VISUALIZATION = "visualization"  # Existing saved visualization
-    SAVED_QUERY = "saved_query"      # Saved query by ID
-    INLINE_QUERY = "inline_query"    # Direct SQL query
+# Types of data sources for placeholders: an existing saved visualization,
+# a saved query by ID, or a direct SQL query
+DataSourceType = Literal["visualization", "saved_query", "inline_query"]
 
 
 class ExcelPlaceholder(BaseModel):
@@ -51,7 +47,7 @@ class ExcelTemplateReportUpdate(BaseModel):
     is_archived: Optional[bool] = None
 
 
-class ExcelTemplateReportResponse(BaseModel):
+class ExcelTemplateReportResponse(ORMBase):
     """Schema for Excel template report response."""
     id: int
     name: str
@@ -65,11 +61,8 @@ class ExcelTemplateReportResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
 
-
-class ExcelTemplateReportListResponse(BaseModel):
+class ExcelTemplateReportListResponse(ORMBase):
     """Schema for Excel template report list response (lightweight)."""
     id: int
     name: str
@@ -82,9 +75,6 @@ class ExcelTemplateReportListResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
-
 
 class TemplateUploadResponse(BaseModel):
     """Schema for template upload response."""
@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Any, Dict
 from datetime import datetime
 
+from app.schemas.base import ORMBase
+
 
 # Cell style structures
 class FontStyle(BaseModel):
@@ -104,7 +106,7 @@ class ExcelTemplateUpdate(BaseModel):
     is_archived: Optional[bool] = None
 
 
-class ExcelTemplateResponse(BaseModel):
+class ExcelTemplateResponse(ORMBase):
     """Schema for Excel template response."""
     id: int
     name: str
@@ -115,11 +117,8 @@ class ExcelTemplateResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
-
 
-class ExcelTemplateListResponse(BaseModel):
+class ExcelTemplateListResponse(ORMBase):
     """Schema for Excel template list response (lightweight)."""
     id: int
     name: str
@@ -129,9 +128,6 @@ class ExcelTemplateListResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
-
 
 class TemplateUploadResponse(BaseModel):
     """Response after uploading a template file."""
@@ -161,7 +157,7 @@ class ExcelReportUpdate(BaseModel):
     is_archived: Optional[bool] = None
 
 
-class ExcelReportResponse(BaseModel):
+class ExcelReportResponse(ORMBase):
     """Schema for Excel report response."""
     id: int
     name: str
@@ -176,11 +172,8 @@ class ExcelReportResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
 
-
-class ExcelReportListResponse(BaseModel):
+class ExcelReportListResponse(ORMBase):
     """Schema for Excel report list response."""
     id: int
     name: str
@@ -192,9 +185,6 @@ class ExcelReportListResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
-
 
 class ExcelReportPreviewRequest(BaseModel):
     """Request for generating a preview with live data."""
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 
 
@@ -20,7 +20,7 @@ class MetabaseTable(BaseModel):
     schema_name: Optional[str] = None
     description: Optional[str] = None
     db_id: int
-    fields: List[MetabaseField] = []
+    fields: List[MetabaseField] = Field(default_factory=list)
 
 
 class MetabaseDatabase(BaseModel):
@@ -29,7 +29,7 @@ class MetabaseDatabase(BaseModel):
     engine: str
     description: Optional[str] = None
     is_sample: bool = False
-    tables: List[MetabaseTable] = []
+    tables: List[MetabaseTable] = Field(default_factory=list)
 
 
 class MetabaseDatabaseCreate(BaseModel):
@@ -41,6 +41,21 @@ class MetabaseDatabaseCreate(BaseModel):
     auto_run_queries: bool = True
 
 
+class MetabaseDatabaseUpdate(BaseModel):
+    name: Optional[str] = None
+    engine: Optional[str] = None
+    details: Optional[Dict[str, Any]] = None
+    description: Optional[str] = None
+    is_full_sync: Optional[bool] = None
+    is_on_demand: Optional[bool] = None
+    auto_run_queries: Optional[bool] = None
+    cache_ttl: Optional[int] = None
+    schedules: Optional[Dict[str, Any]] = None
+
+    # Other Metabase settings are passed through untouched
+    model_config = ConfigDict(extra="allow")
+
+
 class MetabaseQuery(BaseModel):
     database: int
     type: str = "native"  # native or query (MBQL)
@@ -59,9 +74,23 @@ class MetabaseQuestionCreate(BaseModel):
     name: str
     display: str  # table, bar, line, pie, area, etc.
     dataset_query: MetabaseQuery
-    visualization_settings: Dict[str, Any] = {}
+    visualization_settings: Dict[str, Any] = Field(default_factory=dict)
+    description: Optional[str] = None
+    collection_id: Optional[int] = None
+
+
+class MetabaseQuestionUpdate(BaseModel):
+    name: Optional[str] = None
+    display: Optional[str] = None
+    dataset_query: Optional[Dict[str, Any]] = None
+    visualization_settings: Optional[Dict[str, Any]] = None
     description: Optional[str] = None
     collection_id: Optional[int] = None
+    archived: Optional[bool] = None
+    enable_embedding: Optional[bool] = None
+    embedding_params: Optional[Dict[str, Any]] = None
+
+    model_config = ConfigDict(extra="allow")
 
 
 class MetabaseQuestion(BaseModel):
@@ -80,7 +109,7 @@ class MetabaseDashboardCreate(BaseModel):
     name: str
     description: Optional[str] = None
     collection_id: Optional[int] = None
-    parameters: List[Dict[str, Any]] = []
+    parameters: List[Dict[str, Any]] = Field(default_factory=list)
 
 
 class MetabaseDashboard(BaseModel):
@@ -88,8 +117,8 @@ class MetabaseDashboard(BaseModel):
     name: str
     description: Optional[str] = None
     collection_id: Optional[int] = None
-    parameters: List[Dict[str, Any]] = []
-    dashcards: List[Dict[str, Any]] = []
+    parameters: List[Dict[str, Any]] = Field(default_factory=list)
+    dashcards: List[Dict[str, Any]] = Field(default_factory=list)
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
 
@@ -100,10 +129,19 @@ class MetabaseDashcardCreate(BaseModel):
     col: int = 0
     size_x: int = 4
     size_y: int = 4
-    parameter_mappings: List[Dict[str, Any]] = []
+    parameter_mappings: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class MetabaseCollectionCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    parent_id: Optional[int] = None
+    color: Optional[str] = None
+
+    model_config = ConfigDict(extra="allow")
 
 
 class MetabaseEmbedToken(BaseModel):
     resource: Dict[str, int]  # {"question": 123} or {"dashboard": 456}
-    params: Dict[str, Any] = {}
+    params: Dict[str, Any] = Field(default_factory=dict)
     exp: Optional[int] = None  # Expiration timestamp
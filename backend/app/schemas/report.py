@@ -1,14 +1,12 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Any, Dict
+from typing import Optional, List, Any, Dict, Literal
 from datetime import datetime
-from enum import Enum
 
+from app.schemas.base import ORMBase
 
-class BlockType(str, Enum):
-    TEXT = "text"
-    VISUALIZATION = "visualization"
-    TABLE = "table"
-    DIVIDER = "divider"
+
+# Literal rather than Enum: validated by a plain lookup and stored as str
+BlockType = Literal["text", "visualization", "table", "divider"]
 
 
 class TextBlockStyle(BaseModel):
@@ -90,7 +88,7 @@ class ReportUpdate(BaseModel):
     is_archived: Optional[bool] = None
 
 
-class ReportResponse(BaseModel):
+class ReportResponse(ORMBase):
     """Schema for report response."""
     id: int
     name: str
@@ -104,11 +102,8 @@ class ReportResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
-
 
-class ReportListResponse(BaseModel):
+class ReportListResponse(ORMBase):
     """Schema for report list response (lightweight)."""
     id: int
     name: str
@@ -119,9 +114,6 @@ class ReportListResponse(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        from_attributes = True
-
 
 class ExportRequest(BaseModel):
     """Schema for export request."""
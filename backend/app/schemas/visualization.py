@@ -1,15 +1,22 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from app.schemas.base import ORMBase
+
+
+# Default chart palette, also used as the column default for stored rows;
+# each instance gets its own list
+DEFAULT_CUSTOM_COLORS = (
+    "#509EE3", "#88BF4D", "#A989C5", "#EF8C8C",
+    "#F9D45C", "#F2A86F", "#98D9D9", "#7172AD"
+)
+
 
 class VisualizationCustomizationBase(BaseModel):
-    custom_colors: List[str] = [
-        "#509EE3", "#88BF4D", "#A989C5", "#EF8C8C",
-        "#F9D45C", "#F2A86F", "#98D9D9", "#7172AD"
-    ]
+    custom_colors: List[str] = Field(default_factory=lambda: list(DEFAULT_CUSTOM_COLORS))
     color_palette_name: str = "default"
-    custom_labels: Dict[str, str] = {}
+    custom_labels: Dict[str, str] = Field(default_factory=dict)
     x_axis_label: Optional[str] = None
     y_axis_label: Optional[str] = None
     x_axis_format: Optional[str] = None
@@ -20,12 +27,12 @@ class VisualizationCustomizationBase(BaseModel):
     grid_color: str = "#f0f0f0"
     show_data_labels: bool = False
     data_label_format: Optional[str] = None
-    goal_lines: List[Dict[str, Any]] = []
-    reference_lines: List[Dict[str, Any]] = []
-    hidden_columns: List[str] = []
-    column_order: List[str] = []
-    column_widths: Dict[str, int] = {}
-    conditional_formatting: List[Dict[str, Any]] = []
+    goal_lines: List[Dict[str, Any]] = Field(default_factory=list)
+    reference_lines: List[Dict[str, Any]] = Field(default_factory=list)
+    hidden_columns: List[str] = Field(default_factory=list)
+    column_order: List[str] = Field(default_factory=list)
+    column_widths: Dict[str, int] = Field(default_factory=dict)
+    conditional_formatting: List[Dict[str, Any]] = Field(default_factory=list)
     enable_animations: bool = True
 
 
@@ -56,15 +63,12 @@ class VisualizationCustomizationUpdate(BaseModel):
     enable_animations: Optional[bool] = None
 
 
-class VisualizationCustomizationResponse(VisualizationCustomizationBase):
+class VisualizationCustomizationResponse(VisualizationCustomizationBase, ORMBase):
     id: int
     visualization_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-
 
 class VisualizationBase(BaseModel):
     name: str
@@ -74,7 +78,7 @@ class VisualizationBase(BaseModel):
     native_query: Optional[str] = None
     mbql_query: Optional[Dict[str, Any]] = None
     visualization_type: str = "table"
-    visualization_settings: Dict[str, Any] = {}
+    visualization_settings: Dict[str, Any] = Field(default_factory=dict)
 
 
 class VisualizationCreate(VisualizationBase):
@@ -97,7 +101,7 @@ class VisualizationUpdate(BaseModel):
     collection_id: Optional[int] = None
 
 
-class VisualizationResponse(VisualizationBase):
+class VisualizationResponse(VisualizationBase, ORMBase):
     id: int
     metabase_question_id: Optional[int] = None
     is_archived: bool
@@ -106,6 +110,3 @@ class VisualizationResponse(VisualizationBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     customization: Optional[VisualizationCustomizationResponse] = None
-
-    class Config:
-        from_attributes = True
@@ -1,6 +1,21 @@
-from app.services.metabase import MetabaseService
-from app.services.dashboard import DashboardService
-from app.services.visualization import VisualizationService
-from app.services.excel_report import ExcelReportService
+import importlib
+
+# Service name -> defining module, imported on first attribute access so that
+# loading one service module does not pull in every other service and schema
+_SERVICE_MODULES = {
+    "MetabaseService": "app.services.metabase",
+    "DashboardService": "app.services.dashboard",
+    "VisualizationService": "app.services.visualization",
+    "ExcelReportService": "app.services.excel_report",
+}
 
 __all__ = ["MetabaseService", "DashboardService", "VisualizationService", "ExcelReportService"]
+
+
+def __getattr__(name: str):
+    module = _SERVICE_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
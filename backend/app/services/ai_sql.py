@@ -1,8 +1,10 @@
 import httpx
+import io
+import orjson
 from typing import Optional, Dict, Any, List
-import json
 
 from app.core.config import settings
+from app.core.http_client import get_http_client
 
 
 class AISQLService:
@@ -113,28 +115,39 @@ Generate the SQL query:"""
         return "\n".join(lines)
 
     async def _call_ollama(self, prompt: str) -> str:
-        """Call the Ollama API to generate a response."""
+        """Call the Ollama API and collect the streamed (NDJSON) response."""
         headers = {}
         if self.auth:
             headers["Authorization"] = f"Basic {self.auth}"
 
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{self.ollama_url}/api/generate",
-                headers=headers,
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,  # Low temperature for more deterministic SQL
-                        "num_predict": 1000,
-                    }
+        buffer = io.StringIO()
+        async with get_http_client().stream(
+            "POST",
+            f"{self.ollama_url}/api/generate",
+            headers=headers,
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "options": {
+                    "temperature": 0.1,  # Low temperature for more deterministic SQL
+                    "num_predict": 1000,
                 }
-            )
+            },
+            timeout=120.0,
+        ) as response:
             response.raise_for_status()
-            data = response.json()
-            return data.get("response", "")
+            # Each line is a JSON object carrying the next chunk of the response
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                chunk = orjson.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(chunk["error"])
+                buffer.write(chunk.get("response", ""))
+                if chunk.get("done"):
+                    break
+        return buffer.getvalue()
 
     def _parse_response(self, response: str) -> Dict[str, Any]:
         """Parse the LLM response to extract SQL and explanation."""
@@ -145,13 +158,13 @@ Generate the SQL query:"""
             end = response.rfind("}") + 1
             if start != -1 and end > start:
                 json_str = response[start:end]
-                parsed = json.loads(json_str)
+                parsed = orjson.loads(json_str)
                 return {
                     "sql": parsed.get("sql", "").strip(),
                     "explanation": parsed.get("explanation", ""),
                     "error": False
                 }
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
 
         # Fallback: try to extract SQL from code blocks
@@ -204,49 +217,49 @@ Generate the SQL query:"""
             if self.auth:
                 headers["Authorization"] = f"Basic {self.auth}"
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Test with a simple generate request to verify connectivity
-                response = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    headers=headers,
-                    json={
-                        "model": self.model,
-                        "prompt": "Say 'OK' if you can hear me.",
-                        "stream": False,
-                        "options": {
-                            "num_predict": 10,
-                        }
+            # Test with a simple generate request to verify connectivity
+            response = await get_http_client().post(
+                f"{self.ollama_url}/api/generate",
+                headers=headers,
+                json={
+                    "model": self.model,
+                    "prompt": "Say 'OK' if you can hear me.",
+                    "stream": False,
+                    "options": {
+                        "num_predict": 10,
                     }
-                )
+                },
+                timeout=30.0,
+            )
 
-                if response.status_code == 401:
-                    return {
-                        "available": False,
-                        "error": "Authentication failed - check OLLAMA_AUTH credentials"
-                    }
+            if response.status_code == 401:
+                return {
+                    "available": False,
+                    "error": "Authentication failed - check OLLAMA_AUTH credentials"
+                }
 
-                if response.status_code != 200:
-                    return {
-                        "available": False,
-                        "error": f"Ollama is not responding (status: {response.status_code})"
-                    }
+            if response.status_code != 200:
+                return {
+                    "available": False,
+                    "error": f"Ollama is not responding (status: {response.status_code})"
+                }
 
-                # If we get a response, the model is available
-                data = response.json()
-                if data.get("response"):
-                    return {
-                        "available": True,
-                        "model": self.model,
-                        "model_available": True,
-                        "available_models": [self.model]
-                    }
-                else:
-                    return {
-                        "available": True,
-                        "model": self.model,
-                        "model_available": False,
-                        "error": "Model did not respond"
-                    }
+            # If we get a response, the model is available
+            data = response.json()
+            if data.get("response"):
+                return {
+                    "available": True,
+                    "model": self.model,
+                    "model_available": True,
+                    "available_models": [self.model]
+                }
+            else:
+                return {
+                    "available": True,
+                    "model": self.model,
+                    "model_available": False,
+                    "error": "Model did not respond"
+                }
         except httpx.ConnectError:
             return {
                 "available": False,
@@ -1,6 +1,7 @@
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, delete, exists, values, column, cast, func, Integer
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 import uuid
 
@@ -10,11 +11,16 @@ from app.schemas.dashboard import (
     DashboardUpdate,
     DashboardCardCreate,
     DashboardCardUpdate,
+    DashboardCardLayoutUpdate,
     DashboardFilterCreate,
     DashboardFilterUpdate,
 )
 
 
+# Card columns that can be changed through the bulk layout endpoint
+CARD_LAYOUT_FIELDS = ("position_x", "position_y", "width", "height", "z_index")
+
+
 class DashboardService:
     """Service for managing dashboard metadata in our database."""
 
@@ -107,16 +113,40 @@ class DashboardService:
         await self.db.commit()
         return True
 
+    async def dashboard_exists(self, dashboard_id: int) -> bool:
+        """Check whether a dashboard exists without loading it."""
+        result = await self.db.execute(select(exists().where(Dashboard.id == dashboard_id)))
+        return result.scalar()
+
+    async def _commit_child(self, dashboard_id: int, obj: Any) -> bool:
+        """
+        Commit a new card/filter, relying on the dashboard foreign key.
+        Returns False if the dashboard does not exist.
+        """
+        self.db.add(obj)
+        try:
+            await self.db.commit()
+        except IntegrityError:
+            await self.db.rollback()
+            # Only pay for the existence check when the insert failed
+            if not await self.dashboard_exists(dashboard_id):
+                return False
+            raise
+        await self.db.refresh(obj)
+        return True
+
     # ==================== Dashboard Card Operations ====================
 
-    async def get_card(self, card_id: int) -> Optional[DashboardCard]:
-        """Get a single card by ID."""
+    async def get_card(self, card_id: int, dashboard_id: Optional[int] = None) -> Optional[DashboardCard]:
+        """Get a single card by ID, optionally scoped to a dashboard."""
         query = select(DashboardCard).where(DashboardCard.id == card_id)
+        if dashboard_id is not None:
+            query = query.where(DashboardCard.dashboard_id == dashboard_id)
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def add_card(self, dashboard_id: int, data: DashboardCardCreate) -> DashboardCard:
-        """Add a card to a dashboard."""
+    async def add_card(self, dashboard_id: int, data: DashboardCardCreate) -> Optional[DashboardCard]:
+        """Add a card to a dashboard. Returns None if the dashboard does not exist."""
         card = DashboardCard(
             dashboard_id=dashboard_id,
             metabase_question_id=data.metabase_question_id,
@@ -132,14 +162,15 @@ class DashboardService:
             filter_mappings=data.filter_mappings,
             responsive_layouts=data.responsive_layouts,
         )
-        self.db.add(card)
-        await self.db.commit()
-        await self.db.refresh(card)
+        if not await self._commit_child(dashboard_id, card):
+            return None
         return card
 
-    async def update_card(self, card_id: int, data: DashboardCardUpdate) -> Optional[DashboardCard]:
-        """Update a card."""
-        card = await self.get_card(card_id)
+    async def update_card(
+        self, dashboard_id: int, card_id: int, data: DashboardCardUpdate
+    ) -> Optional[DashboardCard]:
+        """Update a card on a dashboard."""
+        card = await self.get_card(card_id, dashboard_id)
         if not card:
             return None
 
@@ -157,41 +188,63 @@ class DashboardService:
         await self.db.refresh(card)
         return card
 
-    async def update_cards_bulk(self, dashboard_id: int, cards_data: List[Dict[str, Any]]) -> List[DashboardCard]:
-        """Update multiple cards at once (for layout changes)."""
-        updated_cards = []
-        for card_data in cards_data:
-            card_id = card_data.pop("id")
-            card = await self.get_card(card_id)
-            if card and card.dashboard_id == dashboard_id:
-                for field, value in card_data.items():
-                    if hasattr(card, field):
-                        setattr(card, field, value)
-                updated_cards.append(card)
-
+    async def update_cards_bulk(
+        self, dashboard_id: int, cards_data: List[DashboardCardLayoutUpdate]
+    ) -> List[DashboardCard]:
+        """Update multiple cards at once (for layout changes) in a single statement."""
+        if not cards_data:
+            return []
+
+        # UPDATE ... FROM (VALUES ...) so every card is written in one round trip.
+        # Missing fields are NULL in the VALUES list and keep their current value.
+        rows = [
+            (card_data.id, *(getattr(card_data, field) for field in CARD_LAYOUT_FIELDS))
+            for card_data in cards_data
+        ]
+        layout = values(
+            column("id", Integer),
+            *(column(field, Integer) for field in CARD_LAYOUT_FIELDS),
+            name="layout",
+        ).data(rows)
+
+        stmt = (
+            update(DashboardCard)
+            .where(DashboardCard.id == cast(layout.c.id, Integer))
+            .where(DashboardCard.dashboard_id == dashboard_id)
+            .values({
+                field: func.coalesce(cast(layout.c[field], Integer), getattr(DashboardCard, field))
+                for field in CARD_LAYOUT_FIELDS
+            })
+            .returning(DashboardCard)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.db.scalars(stmt)
+        updated_cards = result.all()
         await self.db.commit()
         return updated_cards
 
-    async def delete_card(self, card_id: int) -> bool:
-        """Delete a card."""
-        card = await self.get_card(card_id)
-        if not card:
-            return False
-
-        await self.db.delete(card)
+    async def delete_card(self, dashboard_id: int, card_id: int) -> bool:
+        """Delete a card from a dashboard."""
+        result = await self.db.execute(
+            delete(DashboardCard)
+            .where(DashboardCard.id == card_id)
+            .where(DashboardCard.dashboard_id == dashboard_id)
+        )
         await self.db.commit()
-        return True
+        return result.rowcount > 0
 
     # ==================== Dashboard Filter Operations ====================
 
-    async def get_filter(self, filter_id: int) -> Optional[DashboardFilter]:
-        """Get a single filter by ID."""
+    async def get_filter(self, filter_id: int, dashboard_id: Optional[int] = None) -> Optional[DashboardFilter]:
+        """Get a single filter by ID, optionally scoped to a dashboard."""
         query = select(DashboardFilter).where(DashboardFilter.id == filter_id)
+        if dashboard_id is not None:
+            query = query.where(DashboardFilter.dashboard_id == dashboard_id)
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def add_filter(self, dashboard_id: int, data: DashboardFilterCreate) -> DashboardFilter:
-        """Add a filter to a dashboard."""
+    async def add_filter(self, dashboard_id: int, data: DashboardFilterCreate) -> Optional[DashboardFilter]:
+        """Add a filter to a dashboard. Returns None if the dashboard does not exist."""
         filter_obj = DashboardFilter(
             dashboard_id=dashboard_id,
             name=data.name,
@@ -205,14 +258,15 @@ class DashboardService:
             is_required=data.is_required,
             date_range_type=data.date_range_type,
         )
-        self.db.add(filter_obj)
-        await self.db.commit()
-        await self.db.refresh(filter_obj)
+        if not await self._commit_child(dashboard_id, filter_obj):
+            return None
         return filter_obj
 
-    async def update_filter(self, filter_id: int, data: DashboardFilterUpdate) -> Optional[DashboardFilter]:
-        """Update a filter."""
-        filter_obj = await self.get_filter(filter_id)
+    async def update_filter(
+        self, dashboard_id: int, filter_id: int, data: DashboardFilterUpdate
+    ) -> Optional[DashboardFilter]:
+        """Update a filter on a dashboard."""
+        filter_obj = await self.get_filter(filter_id, dashboard_id)
         if not filter_obj:
             return None
 
@@ -224,15 +278,15 @@ class DashboardService:
         await self.db.refresh(filter_obj)
         return filter_obj
 
-    async def delete_filter(self, filter_id: int) -> bool:
-        """Delete a filter."""
-        filter_obj = await self.get_filter(filter_id)
-        if not filter_obj:
-            return False
-
-        await self.db.delete(filter_obj)
+    async def delete_filter(self, dashboard_id: int, filter_id: int) -> bool:
+        """Delete a filter from a dashboard."""
+        result = await self.db.execute(
+            delete(DashboardFilter)
+            .where(DashboardFilter.id == filter_id)
+            .where(DashboardFilter.dashboard_id == dashboard_id)
+        )
         await self.db.commit()
-        return True
+        return result.rowcount > 0
 
     async def reorder_filters(self, dashboard_id: int, filter_ids: List[int]) -> List[DashboardFilter]:
         """Reorder filters by updating their position."""
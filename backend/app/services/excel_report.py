@@ -1,48 +1,217 @@
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, BinaryIO, Iterator, Callable, Awaitable
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, Row
+from pydantic import TypeAdapter
+import asyncio
+import logging
 import secrets
 import os
 import re
 import uuid
-import io
+import shutil
 from datetime import datetime
 
+from app.core.files import make_temp_path
+from app.core.workers import run_in_render_pool
 from app.models.excel_report import ExcelTemplateReport
 from app.schemas.excel_report import (
     ExcelTemplateReportCreate,
     ExcelTemplateReportUpdate,
     ExcelPlaceholder,
     DataSourceMapping,
-    PlaceholderType,
 )
 
+logger = logging.getLogger(__name__)
+
 # Try to import openpyxl - it's optional for development
 try:
     from openpyxl import load_workbook, Workbook
-    from openpyxl.utils import get_column_letter
+    from openpyxl.utils.cell import get_column_letter, column_index_from_string, coordinate_from_string
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
 
+# python-calamine is optional; when present it is used for read-only scans
+try:
+    from python_calamine import CalamineWorkbook
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+
+# Use absolute path for upload directory (works on Windows and Unix).
+# Created once at import rather than on every service instantiation.
+UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads", "excel_templates")
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Columns served by the public share endpoint (ExcelTemplateReportResponse)
+SHARED_REPORT_COLUMNS = (
+    ExcelTemplateReport.id,
+    ExcelTemplateReport.name,
+    ExcelTemplateReport.description,
+    ExcelTemplateReport.template_filename,
+    ExcelTemplateReport.placeholders,
+    ExcelTemplateReport.mappings,
+    ExcelTemplateReport.is_public,
+    ExcelTemplateReport.share_token,
+    ExcelTemplateReport.is_archived,
+    ExcelTemplateReport.created_at,
+    ExcelTemplateReport.updated_at,
+)
 
 # Placeholder pattern: {{type:name}}
 PLACEHOLDER_PATTERN = re.compile(r'\{\{(table|value|chart):(\w+)\}\}')
 
+# Dump whole placeholder lists / mapping dicts for storage in a single pass
+_placeholder_list = TypeAdapter(List[ExcelPlaceholder])
+_mapping_dict = TypeAdapter(Dict[str, DataSourceMapping])
+
+
+def _iter_text_cells(file_path: str) -> Iterator[Tuple[str, str, str]]:
+    """Yield (sheet_name, cell_reference, value) for every non-empty text cell."""
+    if CALAMINE_AVAILABLE:
+        # calamine streams cell values without building an openpyxl DOM
+        wb = CalamineWorkbook.from_path(file_path)
+        for sheet_name in wb.sheet_names:
+            # skip_empty_area=False anchors the grid at A1
+            rows = wb.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+            for row_idx, row in enumerate(rows, start=1):
+                for col_idx, value in enumerate(row, start=1):
+                    if value and isinstance(value, str):
+                        yield sheet_name, f"{get_column_letter(col_idx)}{row_idx}", value
+        return
+
+    # Placeholders are plain cell text, so a streaming read-only pass is enough
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet_name in wb.sheetnames:
+            for row in wb[sheet_name].iter_rows():
+                for cell in row:
+                    if cell.value and isinstance(cell.value, str):
+                        yield sheet_name, cell.coordinate, cell.value
+    finally:
+        wb.close()
+
+
+def detect_placeholders(file_path: str) -> List[ExcelPlaceholder]:
+    """Detect all placeholders in an Excel template (runs in the render pool)."""
+    if not OPENPYXL_AVAILABLE:
+        return []
+
+    placeholders = []
+    for sheet_name, cell_reference, value in _iter_text_cells(file_path):
+        for placeholder_type, placeholder_name in PLACEHOLDER_PATTERN.findall(value):
+            # Every field comes from the pattern match, so skip validation
+            placeholders.append(ExcelPlaceholder.model_construct(
+                id=str(uuid.uuid4()),
+                placeholder=f"{{{{{placeholder_type}:{placeholder_name}}}}}",
+                type=placeholder_type,
+                name=placeholder_name,
+                sheet_name=sheet_name,
+                cell_reference=cell_reference,
+            ))
+
+    return placeholders
+
+
+def _fill_table_data(ws, start_cell: str, data: List[List[Any]]):
+    """Fill table data starting from the given cell."""
+    if not data:
+        ws[start_cell] = ""
+        return
+
+    # Parse start cell reference once
+    col_letter, row_num = coordinate_from_string(start_cell)
+    start_col = column_index_from_string(col_letter)
+
+    # Clear the placeholder
+    ws[start_cell] = ""
+
+    # Write data
+    write_cell = ws.cell
+    for row, row_data in enumerate(data, start=row_num):
+        for col, value in enumerate(row_data, start=start_col):
+            write_cell(row=row, column=col).value = value
+
+
+def fill_excel_template(
+    template_path: str,
+    placeholders: List[Dict[str, Any]],
+    placeholder_rows: Dict[str, List[List[Any]]],
+) -> str:
+    """
+    Fill a template's placeholders with prefetched rows and save the result
+    to a temp file, returning its path (runs in the render pool).
+    """
+    # Load template
+    wb = load_workbook(template_path)
+
+    # Process each placeholder that has data
+    for placeholder_data in placeholders:
+        placeholder_id = placeholder_data.get('id')
+        data = placeholder_rows.get(placeholder_id)
+
+        if data is None:
+            continue
+
+        # Fill placeholder in template
+        sheet_name = placeholder_data.get('sheet_name')
+        cell_ref = placeholder_data.get('cell_reference')
+        placeholder_type = placeholder_data.get('type')
+
+        if sheet_name not in wb.sheetnames:
+            continue
+
+        ws = wb[sheet_name]
+
+        if placeholder_type == 'value':
+            # Single value - replace the cell content
+            if data and len(data) > 0 and len(data[0]) > 0:
+                ws[cell_ref] = data[0][0]
+            else:
+                ws[cell_ref] = ""
+
+        elif placeholder_type == 'table':
+            # Table data - fill starting from the cell
+            _fill_table_data(ws, cell_ref, data)
+
+        elif placeholder_type == 'chart':
+            # Chart - for now just put a placeholder text
+            ws[cell_ref] = "[Chart data]"
+
+    # Save to a temp file so the response can stream it from disk
+    output_path = make_temp_path(suffix=".xlsx")
+    wb.save(output_path)
+    wb.close()
+    return output_path
+
 
 class ExcelReportService:
     """Service for managing Excel template reports."""
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        # Use absolute path for upload directory (works on Windows and Unix)
-        self.upload_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads", "excel_templates")
-        # Ensure upload directory exists
-        os.makedirs(self.upload_dir, exist_ok=True)
-
-    async def get_reports(self, include_archived: bool = False) -> List[ExcelTemplateReport]:
-        """Get all Excel template reports."""
-        query = select(ExcelTemplateReport)
+        self.upload_dir = UPLOAD_DIR
+
+    async def get_report_summaries(self, include_archived: bool = False) -> List[Row]:
+        """
+        Get list rows for all Excel template reports.
+        Placeholder and mapping counts are computed in SQL so the JSON
+        columns are never sent over the wire or decoded.
+        """
+        mapping_keys = func.jsonb_object_keys(ExcelTemplateReport.mappings).table_valued("key")
+        query = select(
+            ExcelTemplateReport.id,
+            ExcelTemplateReport.name,
+            ExcelTemplateReport.description,
+            ExcelTemplateReport.template_filename,
+            func.coalesce(func.jsonb_array_length(ExcelTemplateReport.placeholders), 0).label("placeholder_count"),
+            select(func.count()).select_from(mapping_keys).scalar_subquery().label("mapped_count"),
+            ExcelTemplateReport.is_public,
+            ExcelTemplateReport.is_archived,
+            ExcelTemplateReport.created_at,
+            ExcelTemplateReport.updated_at,
+        )
         if not include_archived:
             query = query.where(ExcelTemplateReport.is_archived == False)
         query = query.order_by(
@@ -50,7 +219,7 @@ class ExcelReportService:
             ExcelTemplateReport.created_at.desc()
         )
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return result.all()
 
     async def get_report(self, report_id: int) -> Optional[ExcelTemplateReport]:
         """Get a single Excel template report by ID."""
@@ -58,15 +227,18 @@ class ExcelReportService:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_report_by_share_token(self, share_token: str) -> Optional[ExcelTemplateReport]:
-        """Get a public Excel template report by its share token."""
+    async def get_report_by_share_token(self, share_token: str) -> Optional[Row]:
+        """
+        Get a public Excel template report by its share token.
+        Returns only the columns the shared view renders.
+        """
         query = (
-            select(ExcelTemplateReport)
+            select(*SHARED_REPORT_COLUMNS)
             .where(ExcelTemplateReport.share_token == share_token)
             .where(ExcelTemplateReport.is_public == True)
         )
         result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        return result.one_or_none()
 
     async def create_report(self, data: ExcelTemplateReportCreate) -> ExcelTemplateReport:
         """Create a new Excel template report."""
@@ -126,7 +298,7 @@ class ExcelReportService:
         return True
 
     async def upload_template(
-        self, report_id: int, file_content: bytes, filename: str
+        self, report_id: int, file_obj: BinaryIO, filename: str
     ) -> Tuple[List[ExcelPlaceholder], str]:
         """
         Upload a template file and detect placeholders.
@@ -151,15 +323,15 @@ class ExcelReportService:
         file_path = os.path.join(self.upload_dir, safe_filename)
 
         with open(file_path, 'wb') as f:
-            f.write(file_content)
+            shutil.copyfileobj(file_obj, f)
 
         # Detect placeholders
-        placeholders = self._detect_placeholders(file_content)
+        placeholders = await run_in_render_pool(detect_placeholders, file_path)
 
         # Update report
         report.template_file_path = file_path
         report.template_filename = filename
-        report.placeholders = [p.model_dump() for p in placeholders]
+        report.placeholders = _placeholder_list.dump_python(placeholders)
         report.mappings = {}  # Reset mappings when template changes
 
         await self.db.commit()
@@ -167,35 +339,6 @@ class ExcelReportService:
 
         return placeholders, filename
 
-    def _detect_placeholders(self, file_content: bytes) -> List[ExcelPlaceholder]:
-        """Detect all placeholders in an Excel template."""
-        if not OPENPYXL_AVAILABLE:
-            return []
-
-        placeholders = []
-        wb = load_workbook(io.BytesIO(file_content))
-
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value and isinstance(cell.value, str):
-                        matches = PLACEHOLDER_PATTERN.findall(cell.value)
-                        for match in matches:
-                            placeholder_type, placeholder_name = match
-                            placeholder = ExcelPlaceholder(
-                                id=str(uuid.uuid4()),
-                                placeholder=f"{{{{{placeholder_type}:{placeholder_name}}}}}",
-                                type=PlaceholderType(placeholder_type),
-                                name=placeholder_name,
-                                sheet_name=sheet_name,
-                                cell_reference=cell.coordinate,
-                            )
-                            placeholders.append(placeholder)
-
-        wb.close()
-        return placeholders
-
     async def update_mappings(
         self, report_id: int, mappings: Dict[str, DataSourceMapping]
     ) -> Optional[ExcelTemplateReport]:
@@ -204,33 +347,57 @@ class ExcelReportService:
         if not report:
             return None
 
-        # Convert mappings to dict
-        mappings_dict = {}
-        for key, mapping in mappings.items():
-            if hasattr(mapping, "model_dump"):
-                mappings_dict[key] = mapping.model_dump()
-            else:
-                mappings_dict[key] = mapping
-
-        report.mappings = mappings_dict
+        report.mappings = _mapping_dict.dump_python(mappings)
 
         await self.db.commit()
         await self.db.refresh(report)
         return report
 
+    async def fetch_placeholder_data(
+        self, report: ExcelTemplateReport, data_fetcher: Callable[[dict], Awaitable[List[List[Any]]]]
+    ) -> Dict[str, List[List[Any]]]:
+        """
+        Fetch data for every mapped placeholder concurrently.
+
+        Args:
+            report: The Excel template report
+            data_fetcher: Async function to fetch data for a mapping
+                          Signature: async def fetch(mapping: dict) -> list[list]
+
+        Returns:
+            Dict of placeholder_id -> rows; placeholders whose fetch failed are left out
+        """
+        mapped = [
+            (placeholder_data.get('id'), report.mappings.get(placeholder_data.get('id')))
+            for placeholder_data in report.placeholders
+        ]
+        mapped = [(placeholder_id, mapping) for placeholder_id, mapping in mapped if mapping]
+
+        results = await asyncio.gather(
+            *(data_fetcher(mapping) for _, mapping in mapped),
+            return_exceptions=True,
+        )
+
+        placeholder_rows = {}
+        for (placeholder_id, _), result in zip(mapped, results):
+            if isinstance(result, Exception):
+                logger.warning("Error fetching data for placeholder %s: %s", placeholder_id, result)
+                continue
+            placeholder_rows[placeholder_id] = result
+        return placeholder_rows
+
     async def generate_excel(
-        self, report_id: int, data_fetcher: callable
-    ) -> Tuple[bytes, str]:
+        self, report_id: int, placeholder_rows: Dict[str, List[List[Any]]]
+    ) -> Tuple[str, str]:
         """
         Generate an Excel file by filling the template with data.
 
         Args:
             report_id: ID of the Excel template report
-            data_fetcher: Async function to fetch data for a mapping
-                          Signature: async def fetch(mapping: dict) -> list[list]
+            placeholder_rows: Prefetched data per placeholder ID (see fetch_placeholder_data)
 
         Returns:
-            Tuple of (file_bytes, filename)
+            Tuple of (temp_file_path, filename); the caller deletes the file
         """
         report = await self.get_report(report_id)
         if not report:
@@ -242,84 +409,15 @@ class ExcelReportService:
         if not OPENPYXL_AVAILABLE:
             raise RuntimeError("openpyxl is not installed")
 
-        # Load template
-        wb = load_workbook(report.template_file_path)
-
-        # Process each placeholder
-        for placeholder_data in report.placeholders:
-            placeholder_id = placeholder_data.get('id')
-            mapping = report.mappings.get(placeholder_id)
-
-            if not mapping:
-                continue
-
-            # Fetch data for this placeholder
-            try:
-                data = await data_fetcher(mapping)
-            except Exception as e:
-                print(f"Error fetching data for placeholder {placeholder_id}: {e}")
-                continue
-
-            # Fill placeholder in template
-            sheet_name = placeholder_data.get('sheet_name')
-            cell_ref = placeholder_data.get('cell_reference')
-            placeholder_type = placeholder_data.get('type')
-
-            if sheet_name not in wb.sheetnames:
-                continue
-
-            ws = wb[sheet_name]
-
-            if placeholder_type == 'value':
-                # Single value - replace the cell content
-                if data and len(data) > 0 and len(data[0]) > 0:
-                    ws[cell_ref] = data[0][0]
-                else:
-                    ws[cell_ref] = ""
-
-            elif placeholder_type == 'table':
-                # Table data - fill starting from the cell
-                self._fill_table_data(ws, cell_ref, data)
-
-            elif placeholder_type == 'chart':
-                # Chart - for now just put a placeholder text
-                ws[cell_ref] = "[Chart data]"
-
-        # Save to bytes
-        output = io.BytesIO()
-        wb.save(output)
-        wb.close()
-        output.seek(0)
+        output_path = await run_in_render_pool(
+            fill_excel_template,
+            report.template_file_path,
+            report.placeholders or [],
+            placeholder_rows,
+        )
 
         filename = f"{report.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-        return output.getvalue(), filename
-
-    def _fill_table_data(self, ws, start_cell: str, data: List[List[Any]]):
-        """Fill table data starting from the given cell."""
-        if not data:
-            ws[start_cell] = ""
-            return
-
-        # Parse start cell reference
-        col_letter = ''.join(c for c in start_cell if c.isalpha())
-        row_num = int(''.join(c for c in start_cell if c.isdigit()))
-
-        # Clear the placeholder
-        ws[start_cell] = ""
-
-        # Write data
-        for row_idx, row_data in enumerate(data):
-            for col_idx, value in enumerate(row_data):
-                col = self._get_column_index(col_letter) + col_idx
-                cell = ws.cell(row=row_num + row_idx, column=col)
-                cell.value = value
-
-    def _get_column_index(self, col_letter: str) -> int:
-        """Convert column letter(s) to 1-based index."""
-        result = 0
-        for char in col_letter.upper():
-            result = result * 26 + (ord(char) - ord('A') + 1)
-        return result
+        return output_path, filename
 
     async def generate_share_token(self, report_id: int) -> Optional[ExcelTemplateReport]:
         """Generate or regenerate a share token for a report."""
@@ -1,13 +1,23 @@
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, type_coerce, Row
+from sqlalchemy.orm import defer, joinedload
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+import hashlib
 import os
 import uuid
 import secrets
+import time
 
+import orjson
+
+from app.core.cache import AsyncTTLCache
+from app.core.files import make_temp_path, save_upload
+from app.core.workers import run_in_render_pool
 from app.models.excel_template import ExcelTemplate
 from app.models.excel_report import ExcelTemplateReport
+from app.models.types import RawCompressedJSON
 from app.schemas.excel_template import (
     ExcelTemplateCreate,
     ExcelTemplateUpdate,
@@ -19,13 +29,61 @@ from app.schemas.excel_template import (
 # Try to import openpyxl
 try:
     from openpyxl import load_workbook, Workbook
-    from openpyxl.utils import get_column_letter, column_index_from_string
+    from openpyxl.utils.cell import get_column_letter, column_index_from_string, coordinate_from_string
     from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
 
 
+# Created once at import rather than on every service instantiation
+UPLOAD_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    "uploads", "excel_templates"
+)
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Generated workbooks, reused while their inputs are unchanged
+EXPORT_CACHE_DIR = os.path.join(os.path.dirname(UPLOAD_DIR), "export_cache")
+EXPORT_CACHE_MAX_FILES = 64
+# Exports used this recently are never pruned; another request may have been
+# handed the path and not opened it yet
+EXPORT_CACHE_GRACE_SECONDS = 300
+os.makedirs(EXPORT_CACHE_DIR, exist_ok=True)
+
+# Parsed template structures keyed by file content hash. Entries are
+# content-addressed, so a re-upload of a changed file never hits a stale one.
+_structure_cache = AsyncTTLCache(ttl=86400, maxsize=32)
+
+
+def _prune_export_cache(keep: str) -> None:
+    """
+    Drop the least recently used exports beyond EXPORT_CACHE_MAX_FILES.
+    `keep` (the export about to be served) and anything used within
+    EXPORT_CACHE_GRACE_SECONDS are left alone. Blocking; run it in a thread.
+    """
+    entries = []
+    for entry in os.scandir(EXPORT_CACHE_DIR):
+        if not entry.name.endswith(".xlsx"):
+            continue
+        try:
+            entries.append((entry.stat().st_mtime, entry.path))
+        except FileNotFoundError:
+            # Already removed by a concurrent prune
+            continue
+    if len(entries) <= EXPORT_CACHE_MAX_FILES:
+        return
+    entries.sort()
+    cutoff = time.time() - EXPORT_CACHE_GRACE_SECONDS
+    for mtime, path in entries[:len(entries) - EXPORT_CACHE_MAX_FILES]:
+        if path == keep or mtime >= cutoff:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
 def rgb_to_hex(rgb_color) -> Optional[str]:
     """Convert openpyxl color to hex string."""
     if rgb_color is None:
@@ -171,8 +229,9 @@ def generate_excel_with_data(
     template_path: str,
     sheet_data: Dict[str, Any],
     data_sources: List[Dict[str, Any]],
-    visualization_data: Dict[int, List[Dict[str, Any]]]
-) -> bytes:
+    visualization_data: Dict[int, List[Dict[str, Any]]],
+    output_dir: Optional[str] = None
+) -> str:
     """
     Generate an Excel file from a template with data filled in.
 
@@ -181,9 +240,10 @@ def generate_excel_with_data(
         sheet_data: Cell modifications made by user
         data_sources: Data source mappings
         visualization_data: Dict of visualization_id -> data rows
+        output_dir: Directory for the output file (system temp dir by default)
 
     Returns:
-        Excel file as bytes
+        Path to the generated temp file; the caller deletes it
     """
     if not OPENPYXL_AVAILABLE:
         raise RuntimeError("openpyxl is not installed")
@@ -201,6 +261,7 @@ def generate_excel_with_data(
                     ws[cell_ref] = cell_data.get("value", "")
 
     # Apply data source mappings
+    header_font = Font(bold=True)
     for mapping in data_sources:
         viz_id = mapping.get("visualization_id")
         sheet_name = mapping.get("sheet_name")
@@ -220,17 +281,10 @@ def generate_excel_with_data(
 
         ws = wb[sheet_name]
 
-        # Parse start cell
-        start_col = ""
-        start_row = ""
-        for char in start_cell:
-            if char.isalpha():
-                start_col += char
-            else:
-                start_row += char
-
+        # Parse start cell and resolve column positions once per mapping
+        start_col, start_row_idx = coordinate_from_string(start_cell)
         start_col_idx = column_index_from_string(start_col)
-        start_row_idx = int(start_row)
+        source_columns = [col_map.get("source_column") for col_map in columns]
 
         current_row = start_row_idx
 
@@ -241,24 +295,26 @@ def generate_excel_with_data(
                 # Use header_label (custom name) if available, otherwise fall back to source_column
                 cell.value = col_map.get("header_label") or col_map.get("source_column", "")
                 # Style header
-                cell.font = Font(bold=True)
-            current_row += 1
-
-        # Write data rows
-        for data_row in data_rows:
-            for col_offset, col_map in enumerate(columns):
-                source_col = col_map.get("source_column")
-                cell = ws.cell(row=current_row, column=start_col_idx + col_offset)
-                cell.value = data_row.get(source_col, "")
+                cell.font = header_font
             current_row += 1
 
-    # Save to bytes
-    from io import BytesIO
-    output = BytesIO()
-    wb.save(output)
+        # Write data rows; target columns are resolved once per mapping
+        write_cell = ws.cell
+        targets = list(enumerate(source_columns, start=start_col_idx))
+        for row_idx, data_row in enumerate(data_rows, start=current_row):
+            get_value = data_row.get
+            for col_idx, source_col in targets:
+                write_cell(row=row_idx, column=col_idx).value = get_value(source_col, "")
+
+    # Save to a temp file so the response can stream it from disk
+    output_path = make_temp_path(suffix=".xlsx", dir=output_dir)
+    wb.save(output_path)
     wb.close()
-    output.seek(0)
-    return output.read()
+    return output_path
+
+
+# Template structure as its stored JSON text, embedded into responses unparsed
+RAW_STRUCTURE = type_coerce(ExcelTemplate.structure, RawCompressedJSON()).label("structure")
 
 
 class ExcelTemplateService:
@@ -266,15 +322,23 @@ class ExcelTemplateService:
 
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.upload_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            "uploads", "excel_templates"
+        self.upload_dir = UPLOAD_DIR
+
+    async def get_template_summaries(self, include_archived: bool = False) -> List[Row]:
+        """
+        Get list rows for all templates.
+        Only the listed columns are selected, so the compressed structure
+        is never read.
+        """
+        query = select(
+            ExcelTemplate.id,
+            ExcelTemplate.name,
+            ExcelTemplate.description,
+            ExcelTemplate.file_name,
+            ExcelTemplate.is_archived,
+            ExcelTemplate.created_at,
+            ExcelTemplate.updated_at,
         )
-        os.makedirs(self.upload_dir, exist_ok=True)
-
-    async def get_templates(self, include_archived: bool = False) -> List[ExcelTemplate]:
-        """Get all Excel templates."""
-        query = select(ExcelTemplate)
         if not include_archived:
             query = query.where(ExcelTemplate.is_archived == False)
         query = query.order_by(
@@ -282,7 +346,7 @@ class ExcelTemplateService:
             ExcelTemplate.created_at.desc()
         )
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return result.all()
 
     async def get_template(self, template_id: int) -> Optional[ExcelTemplate]:
         """Get a single template by ID."""
@@ -290,6 +354,21 @@ class ExcelTemplateService:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_template_row(self, template_id: int) -> Optional[Row]:
+        """Get a single template as a row, with its structure left as raw JSON."""
+        query = select(
+            ExcelTemplate.id,
+            ExcelTemplate.name,
+            ExcelTemplate.description,
+            ExcelTemplate.file_name,
+            RAW_STRUCTURE,
+            ExcelTemplate.is_archived,
+            ExcelTemplate.created_at,
+            ExcelTemplate.updated_at,
+        ).where(ExcelTemplate.id == template_id)
+        result = await self.db.execute(query)
+        return result.one_or_none()
+
     async def create_template(self, data: ExcelTemplateCreate) -> ExcelTemplate:
         """Create a new template (without file)."""
         template = ExcelTemplate(
@@ -320,18 +399,19 @@ class ExcelTemplateService:
         unique_filename = f"{uuid.uuid4()}{file_ext}"
         file_path = os.path.join(self.upload_dir, unique_filename)
 
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
+        content_hash = await save_upload(file, file_path)
 
-        # Parse template
-        try:
-            structure = parse_excel_template(file_path)
-        except Exception as e:
-            # Clean up file on error
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            raise e
+        # Parse template, unless the same file content was parsed recently
+        structure = _structure_cache.get(content_hash)
+        if structure is None:
+            try:
+                structure = await run_in_render_pool(parse_excel_template, file_path)
+            except Exception as e:
+                # Clean up file on error
+                if os.path.exists(file_path):
+                    os.remove(file_path)
+                raise e
+            _structure_cache.set(content_hash, structure)
 
         # Update template
         template.file_path = file_path
@@ -375,15 +455,44 @@ class ExcelTemplateService:
         return True
 
 
+# Report columns served by the single-report and public share endpoints
+SHARED_REPORT_COLUMNS = (
+    ExcelTemplateReport.id,
+    ExcelTemplateReport.name,
+    ExcelTemplateReport.description,
+    ExcelTemplateReport.template_id,
+    ExcelTemplateReport.sheet_data,
+    ExcelTemplateReport.data_sources,
+    ExcelTemplateReport.is_public,
+    ExcelTemplateReport.share_token,
+    ExcelTemplateReport.is_archived,
+    ExcelTemplateReport.created_at,
+    ExcelTemplateReport.updated_at,
+)
+
+
 class ExcelReportService:
     """Service for managing Excel reports."""
 
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_reports(self, include_archived: bool = False) -> List[ExcelTemplateReport]:
-        """Get all Excel reports."""
-        query = select(ExcelTemplateReport)
+    async def get_report_summaries(self, include_archived: bool = False) -> List[Row]:
+        """
+        Get list rows for all reports, with each template's name joined in.
+        The sheet data, mappings and template structure are never loaded.
+        """
+        query = select(
+            ExcelTemplateReport.id,
+            ExcelTemplateReport.name,
+            ExcelTemplateReport.description,
+            ExcelTemplateReport.template_id,
+            ExcelTemplate.name.label("template_name"),
+            ExcelTemplateReport.is_public,
+            ExcelTemplateReport.is_archived,
+            ExcelTemplateReport.created_at,
+            ExcelTemplateReport.updated_at,
+        ).outerjoin(ExcelTemplate, ExcelTemplateReport.template_id == ExcelTemplate.id)
         if not include_archived:
             query = query.where(ExcelTemplateReport.is_archived == False)
         query = query.order_by(
@@ -391,23 +500,50 @@ class ExcelReportService:
             ExcelTemplateReport.created_at.desc()
         )
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return result.all()
 
-    async def get_report(self, report_id: int) -> Optional[ExcelTemplateReport]:
-        """Get a single report by ID."""
+    async def get_report(self, report_id: int, load_template: bool = False) -> Optional[ExcelTemplateReport]:
+        """Get a single report by ID, optionally joining its template in the same query."""
         query = select(ExcelTemplateReport).where(ExcelTemplateReport.id == report_id)
+        if load_template:
+            query = query.options(joinedload(ExcelTemplateReport.template)).execution_options(
+                populate_existing=True
+            )
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_report_by_share_token(self, share_token: str) -> Optional[ExcelTemplateReport]:
-        """Get a public report by share token."""
+    async def get_report_row(self, report_id: int) -> Optional[Row]:
+        """
+        Get a single report as a row, plus its template's version and raw
+        structure, in a single query.
+        """
         query = (
-            select(ExcelTemplateReport)
+            select(
+                *SHARED_REPORT_COLUMNS,
+                ExcelTemplate.id.label("joined_template_id"),
+                func.coalesce(ExcelTemplate.updated_at, ExcelTemplate.created_at).label("template_version"),
+                RAW_STRUCTURE,
+            )
+            .outerjoin(ExcelTemplate, ExcelTemplate.id == ExcelTemplateReport.template_id)
+            .where(ExcelTemplateReport.id == report_id)
+        )
+        result = await self.db.execute(query)
+        return result.one_or_none()
+
+    async def get_report_by_share_token(self, share_token: str) -> Optional[Row]:
+        """
+        Get a public report by share token.
+        Returns only the columns the shared view renders, plus the template
+        structure, in a single query.
+        """
+        query = (
+            select(*SHARED_REPORT_COLUMNS, RAW_STRUCTURE)
+            .outerjoin(ExcelTemplate, ExcelTemplate.id == ExcelTemplateReport.template_id)
             .where(ExcelTemplateReport.share_token == share_token)
             .where(ExcelTemplateReport.is_public == True)
         )
         result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        return result.one_or_none()
 
     async def create_report(self, data: ExcelReportCreate) -> ExcelTemplateReport:
         """Create a new report from template."""
@@ -425,10 +561,11 @@ class ExcelReportService:
             template_id=data.template_id,
             sheet_data={},
             data_sources=data_sources_list,
+            # Set explicitly, otherwise the insert re-selects it after RETURNING
+            updated_at=None,
         )
         self.db.add(report)
         await self.db.commit()
-        await self.db.refresh(report)
         return report
 
     async def update_report(
@@ -437,7 +574,8 @@ class ExcelReportService:
         data: ExcelReportUpdate
     ) -> Optional[ExcelTemplateReport]:
         """Update a report."""
-        report = await self.get_report(report_id)
+        # Load the template up front so the response needs no second lookup
+        report = await self.get_report(report_id, load_template=True)
         if not report:
             return None
 
@@ -454,7 +592,6 @@ class ExcelReportService:
             setattr(report, field, value)
 
         await self.db.commit()
-        await self.db.refresh(report)
         return report
 
     async def delete_report(self, report_id: int) -> bool:
@@ -477,7 +614,6 @@ class ExcelReportService:
         report.is_public = True
 
         await self.db.commit()
-        await self.db.refresh(report)
         return report
 
     async def revoke_share(self, report_id: int) -> Optional[ExcelTemplateReport]:
@@ -490,30 +626,51 @@ class ExcelReportService:
         report.is_public = False
 
         await self.db.commit()
-        await self.db.refresh(report)
         return report
 
     async def generate_excel(
         self,
         report_id: int,
         visualization_data: Dict[int, List[Dict[str, Any]]]
-    ) -> Optional[bytes]:
-        """Generate Excel file with data."""
-        report = await self.get_report(report_id)
-        if not report or not report.template_id:
+    ) -> Optional[str]:
+        """
+        Generate Excel file with data, returning the path of the cached export.
+
+        Exports are cached on disk by a hash of everything that goes into them,
+        so downloading an unchanged report again skips the openpyxl work.
+        """
+        report = await self.get_report(report_id, load_template=True)
+        if not report or not report.template:
             return None
 
-        # Get template
-        template_query = select(ExcelTemplate).where(ExcelTemplate.id == report.template_id)
-        result = await self.db.execute(template_query)
-        template = result.scalar_one_or_none()
-
-        if not template or not template.file_path:
+        template = report.template
+        if not template.file_path:
             return None
 
-        return generate_excel_with_data(
-            template.file_path,
-            report.sheet_data or {},
-            report.data_sources or [],
-            visualization_data
-        )
+        cache_key = hashlib.blake2b(digest_size=16)
+        cache_key.update(f"{template.id}:{template.file_path}".encode())
+        for part in (report.sheet_data or {}, report.data_sources or [], visualization_data):
+            cache_key.update(orjson.dumps(part, option=orjson.OPT_NON_STR_KEYS, default=str))
+        cache_path = os.path.join(EXPORT_CACHE_DIR, f"{report_id}-{cache_key.hexdigest()}.xlsx")
+
+        try:
+            # Touch it so pruning treats it as recently used
+            os.utime(cache_path)
+            cached = True
+        except FileNotFoundError:
+            # Never rendered, or pruned by another request since: render it
+            cached = False
+        if not cached:
+            temp_path = await run_in_render_pool(
+                generate_excel_with_data,
+                template.file_path,
+                report.sheet_data or {},
+                report.data_sources or [],
+                visualization_data,
+                output_dir=EXPORT_CACHE_DIR,
+            )
+            os.replace(temp_path, cache_path)
+
+        # Prune off the event loop, before the path is handed to the response
+        await run_in_threadpool(_prune_export_cache, cache_path)
+        return cache_path
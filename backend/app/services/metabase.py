@@ -1,10 +1,25 @@
+import asyncio
 import httpx
 import jwt
 import time
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 
+from app.core.cache import AsyncTTLCache
 from app.core.config import settings
+from app.core.http_client import get_http_client
+
+
+# Upper bound on schema syncs triggered at once by sync_databases
+MAX_CONCURRENT_SYNCS = 10
+
+# List endpoints (databases, questions, dashboards, collections) change on a
+# minute scale; their responses are reused for this long
+LIST_CACHE_TTL_SECONDS = 30
+
+# Signed embed tokens are reused for this long; only tokens that stay valid
+# for at least twice this long are cached, so a reused token never expires early
+EMBED_TOKEN_REUSE_SECONDS = 300
 
 
 class MetabaseService:
@@ -18,6 +33,10 @@ class MetabaseService:
         self.api_key = api_key or settings.METABASE_API_KEY
         self.session_token = session_token
         self.embedding_secret = settings.METABASE_EMBEDDING_SECRET_KEY
+        self._list_cache = AsyncTTLCache(ttl=LIST_CACHE_TTL_SECONDS, maxsize=256)
+        self._embed_tokens = AsyncTTLCache(ttl=EMBED_TOKEN_REUSE_SECONDS, maxsize=4096)
+        # In-flight GETs keyed by (endpoint, params), shared by concurrent callers
+        self._inflight: Dict[Tuple[str, Any], "asyncio.Task[Any]"] = {}
 
     def _get_headers(self) -> Dict[str, str]:
         """Get authentication headers for Metabase API requests."""
@@ -48,16 +67,77 @@ class MetabaseService:
         url = f"{self.base_url}{endpoint}"
         headers = self._get_headers()
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                headers=headers,
-                json=data,
-                params=params,
-            )
+        response = await get_http_client().request(
+            method=method,
+            url=url,
+            headers=headers,
+            json=data,
+            params=params,
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return response.json() if response.content else {}
+
+    async def _open_stream(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+        timeout: float = 30.0,
+    ) -> httpx.Response:
+        """
+        Send a request to Metabase API and return the response with its body
+        still unread, so it can be relayed without decoding it.
+        The caller must close the returned response.
+        """
+        client = get_http_client()
+        request = client.build_request(
+            method,
+            f"{self.base_url}{endpoint}",
+            headers=self._get_headers(),
+            json=data,
+            timeout=timeout,
+        )
+        response = await client.send(request, stream=True)
+        if response.is_error:
+            await response.aread()
+            await response.aclose()
             response.raise_for_status()
-            return response.json() if response.content else {}
+        return response
+
+    async def _shared_get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET an endpoint, coalescing concurrent identical calls into one request.
+
+        Callers that arrive while a request is in flight await the same task
+        instead of issuing their own; nothing is cached once it completes.
+        The result is shared, so callers must not mutate it.
+        """
+        key = (endpoint, tuple(sorted(params.items())) if params else None)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request("GET", endpoint, params=params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one caller's cancellation doesn't fail the others
+        return await asyncio.shield(task)
+
+    async def _cached_get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET a list endpoint through the short-lived list cache."""
+        key = (endpoint, tuple(sorted(params.items())) if params else None)
+        return await self._list_cache.get_or_set(key, lambda: self._shared_get(endpoint, params))
+
+    async def _write(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Make a request that changes Metabase objects, dropping cached lists."""
+        try:
+            return await self._request(method, endpoint, data=data)
+        finally:
+            self._list_cache.invalidate()
 
     # ==================== Authentication ====================
 
@@ -79,7 +159,7 @@ class MetabaseService:
 
     async def get_databases(self) -> List[Dict[str, Any]]:
         """Get list of all databases."""
-        response = await self._request("GET", "/api/database")
+        response = await self._cached_get("/api/database")
         return response.get("data", response) if isinstance(response, dict) else response
 
     async def get_database(self, database_id: int) -> Dict[str, Any]:
@@ -88,24 +168,47 @@ class MetabaseService:
 
     async def get_database_metadata(self, database_id: int) -> Dict[str, Any]:
         """Get database metadata including tables and fields."""
-        return await self._request("GET", f"/api/database/{database_id}/metadata")
+        return await self._shared_get(f"/api/database/{database_id}/metadata")
 
     async def create_database(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new database connection."""
-        return await self._request("POST", "/api/database", data=data)
+        return await self._write("POST", "/api/database", data=data)
 
     async def update_database(self, database_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update database connection settings."""
-        return await self._request("PUT", f"/api/database/{database_id}", data=data)
+        return await self._write("PUT", f"/api/database/{database_id}", data=data)
 
     async def delete_database(self, database_id: int) -> Dict[str, Any]:
         """Delete a database connection."""
-        return await self._request("DELETE", f"/api/database/{database_id}")
+        return await self._write("DELETE", f"/api/database/{database_id}")
 
     async def sync_database_schema(self, database_id: int) -> Dict[str, Any]:
         """Trigger schema sync for a database."""
         return await self._request("POST", f"/api/database/{database_id}/sync_schema")
 
+    async def sync_databases(self, database_ids: Optional[List[int]] = None) -> Dict[int, str]:
+        """
+        Trigger schema sync for several databases concurrently.
+        Syncs every visible database when no ids are given.
+        Returns a dict of database_id -> "ok" or the error message.
+        """
+        if database_ids is None:
+            database_ids = [db["id"] for db in await self.get_databases()]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SYNCS)
+
+        async def sync(database_id: int) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.sync_database_schema(database_id)
+
+        results = await asyncio.gather(
+            *(sync(database_id) for database_id in database_ids),
+            return_exceptions=True,
+        )
+        return {
+            database_id: str(result) if isinstance(result, Exception) else "ok"
+            for database_id, result in zip(database_ids, results)
+        }
+
     async def validate_database(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Test database connection without saving."""
         return await self._request("POST", "/api/database/validate", data=data)
@@ -138,12 +241,20 @@ class MetabaseService:
             sql: SQL query string
             timeout: Request timeout in seconds (default 30s, use 300s for large exports)
         """
-        query = {
+        return await self.execute_query(self.native_query(database_id, sql), timeout=timeout)
+
+    @staticmethod
+    def native_query(database_id: int, sql: str) -> Dict[str, Any]:
+        """Build a native SQL dataset query."""
+        return {
             "database": database_id,
             "type": "native",
             "native": {"query": sql},
         }
-        return await self.execute_query(query, timeout=timeout)
+
+    async def stream_query(self, query: Dict[str, Any], timeout: float = 30.0) -> httpx.Response:
+        """Execute a query, returning the unread Metabase response (caller closes it)."""
+        return await self._open_stream("POST", "/api/dataset", data=query, timeout=timeout)
 
     async def execute_mbql_query(
         self,
@@ -174,7 +285,7 @@ class MetabaseService:
         params = {}
         if collection_id:
             params["collection_id"] = collection_id
-        response = await self._request("GET", "/api/card", params=params)
+        response = await self._cached_get("/api/card", params=params)
         return response
 
     async def get_question(self, question_id: int) -> Dict[str, Any]:
@@ -183,26 +294,33 @@ class MetabaseService:
 
     async def create_question(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new question/card."""
-        return await self._request("POST", "/api/card", data=data)
+        return await self._write("POST", "/api/card", data=data)
 
     async def update_question(self, question_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a question/card."""
-        return await self._request("PUT", f"/api/card/{question_id}", data=data)
+        return await self._write("PUT", f"/api/card/{question_id}", data=data)
 
     async def delete_question(self, question_id: int) -> Dict[str, Any]:
         """Delete a question/card."""
-        return await self._request("DELETE", f"/api/card/{question_id}")
+        return await self._write("DELETE", f"/api/card/{question_id}")
 
     async def execute_question(self, question_id: int, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Execute a saved question and get results."""
         endpoint = f"/api/card/{question_id}/query"
         return await self._request("POST", endpoint, data=params or {})
 
+    async def stream_question(
+        self, question_id: int, params: Optional[Dict[str, Any]] = None
+    ) -> httpx.Response:
+        """Execute a saved question, returning the unread Metabase response (caller closes it)."""
+        endpoint = f"/api/card/{question_id}/query"
+        return await self._open_stream("POST", endpoint, data=params or {})
+
     # ==================== Dashboards ====================
 
     async def get_dashboards(self) -> List[Dict[str, Any]]:
         """Get list of all dashboards."""
-        return await self._request("GET", "/api/dashboard")
+        return await self._cached_get("/api/dashboard")
 
     async def get_dashboard(self, dashboard_id: int) -> Dict[str, Any]:
         """Get single dashboard with all cards."""
@@ -210,15 +328,15 @@ class MetabaseService:
 
     async def create_dashboard(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new dashboard."""
-        return await self._request("POST", "/api/dashboard", data=data)
+        return await self._write("POST", "/api/dashboard", data=data)
 
     async def update_dashboard(self, dashboard_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Update dashboard metadata."""
-        return await self._request("PUT", f"/api/dashboard/{dashboard_id}", data=data)
+        return await self._write("PUT", f"/api/dashboard/{dashboard_id}", data=data)
 
     async def delete_dashboard(self, dashboard_id: int) -> Dict[str, Any]:
         """Delete a dashboard."""
-        return await self._request("DELETE", f"/api/dashboard/{dashboard_id}")
+        return await self._write("DELETE", f"/api/dashboard/{dashboard_id}")
 
     async def add_dashboard_card(self, dashboard_id: int, data: Dict[str, Any]) -> Dict[str, Any]:
         """Add a card to a dashboard."""
@@ -236,7 +354,7 @@ class MetabaseService:
 
     async def get_collections(self) -> List[Dict[str, Any]]:
         """Get list of all collections."""
-        return await self._request("GET", "/api/collection")
+        return await self._cached_get("/api/collection")
 
     async def get_collection(self, collection_id: int) -> Dict[str, Any]:
         """Get single collection details."""
@@ -244,7 +362,7 @@ class MetabaseService:
 
     async def create_collection(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new collection."""
-        return await self._request("POST", "/api/collection", data=data)
+        return await self._write("POST", "/api/collection", data=data)
 
     async def get_collection_items(self, collection_id: int) -> Dict[str, Any]:
         """Get items in a collection."""
@@ -268,12 +386,21 @@ class MetabaseService:
             params: Filter parameters to lock in the embed
             exp_minutes: Token expiration time in minutes
         """
+        cacheable = not params and exp_minutes * 60 >= 2 * EMBED_TOKEN_REUSE_SECONDS
+        cache_key = (resource_type, resource_id, exp_minutes)
+        if cacheable:
+            token = self._embed_tokens.get(cache_key)
+            if token is not None:
+                return token
+
         payload = {
             "resource": {resource_type: resource_id},
             "params": params or {},
             "exp": int(time.time()) + (exp_minutes * 60),
         }
         token = jwt.encode(payload, self.embedding_secret, algorithm="HS256")
+        if cacheable:
+            self._embed_tokens.set(cache_key, token)
         return token
 
     def get_embed_url(
@@ -332,8 +459,7 @@ class MetabaseService:
     async def health_check(self) -> bool:
         """Check if Metabase is healthy and accessible."""
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/api/health")
-                return response.status_code == 200
+            response = await get_http_client().get(f"{self.base_url}/api/health", timeout=5.0)
+            return response.status_code == 200
         except Exception:
             return False
@@ -1,6 +1,6 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Row, case, func, select
 import secrets
 
 from app.models.report import Report
@@ -10,20 +10,53 @@ from app.schemas.report import (
 )
 
 
+# Report columns served by the public share endpoint (those ReportResponse reads)
+SHARED_REPORT_COLUMNS = (
+    Report.id,
+    Report.name,
+    Report.description,
+    Report.elements,
+    Report.blocks,
+    Report.settings,
+    Report.is_public,
+    Report.share_token,
+    Report.is_archived,
+    Report.created_at,
+    Report.updated_at,
+)
+
+
 class ReportService:
     """Service for managing reports."""
 
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_reports(self, include_archived: bool = False) -> List[Report]:
-        """Get all reports."""
-        query = select(Report)
+    async def get_report_summaries(self, include_archived: bool = False) -> List[Row]:
+        """
+        Get list rows for all reports.
+        The block count is computed in SQL so the blocks JSON is never
+        sent over the wire or decoded.
+        """
+        block_count = case(
+            (func.jsonb_typeof(Report.blocks) == "array", func.jsonb_array_length(Report.blocks)),
+            else_=0,
+        )
+        query = select(
+            Report.id,
+            Report.name,
+            Report.description,
+            block_count.label("block_count"),
+            Report.is_public,
+            Report.is_archived,
+            Report.created_at,
+            Report.updated_at,
+        )
         if not include_archived:
             query = query.where(Report.is_archived == False)
         query = query.order_by(Report.updated_at.desc().nullsfirst(), Report.created_at.desc())
         result = await self.db.execute(query)
-        return result.scalars().all()
+        return result.all()
 
     async def get_report(self, report_id: int) -> Optional[Report]:
         """Get a single report by ID."""
@@ -31,15 +64,19 @@ class ReportService:
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_report_by_share_token(self, share_token: str) -> Optional[Report]:
-        """Get a public report by its share token."""
+    async def get_report_by_share_token(self, share_token: str) -> Optional[Row]:
+        """
+        Get a public report by its share token.
+        Returns only the columns the shared view renders, as a plain row;
+        no ORM object is built or added to the session.
+        """
         query = (
-            select(Report)
+            select(*SHARED_REPORT_COLUMNS)
             .where(Report.share_token == share_token)
             .where(Report.is_public == True)
         )
         result = await self.db.execute(query)
-        return result.scalar_one_or_none()
+        return result.one_or_none()
 
     async def create_report(self, data: ReportCreate) -> Report:
         """Create a new report."""
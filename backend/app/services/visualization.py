@@ -1,7 +1,11 @@
+import asyncio
+import logging
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
 
 from app.models.visualization import Visualization, VisualizationCustomization
 from app.schemas.visualization import (
@@ -12,6 +16,23 @@ from app.schemas.visualization import (
 )
 from app.services.metabase import MetabaseService
 
+logger = logging.getLogger(__name__)
+
+
+# Upper bound on Metabase queries run at once by execute_visualizations
+MAX_CONCURRENT_EXECUTIONS = 8
+
+# Fields that cannot change once a visualization's query is locked
+QUERY_FIELDS = frozenset({'database_id', 'query_type', 'native_query', 'mbql_query', 'metabase_question_id'})
+
+
+class LockedFieldsError(Exception):
+    """Raised when an update touches query fields of a locked visualization."""
+
+    def __init__(self, fields: List[str]):
+        self.fields = fields
+        super().__init__(f"Query is locked. Cannot modify: {', '.join(fields)}")
+
 
 class VisualizationService:
     """Service for managing visualization metadata in our database."""
@@ -30,19 +51,58 @@ class VisualizationService:
         result = await self.db.execute(query)
         return result.scalars().all()
 
+    async def get_visualization_rows(self, include_archived: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get all visualizations as plain dicts, each with its customization dict
+        (or None) under "customization". No ORM objects are built, so the
+        rows can be validated against the response schema directly.
+        """
+        query = select(Visualization.__table__)
+        customizations = select(VisualizationCustomization.__table__).join(Visualization)
+        if not include_archived:
+            query = query.where(Visualization.is_archived == False)
+            customizations = customizations.where(Visualization.is_archived == False)
+
+        rows = [dict(row) for row in (await self.db.execute(query)).mappings()]
+        if not rows:
+            return rows
+
+        by_visualization = {
+            row["visualization_id"]: dict(row)
+            for row in (await self.db.execute(customizations)).mappings()
+        }
+        for row in rows:
+            row["customization"] = by_visualization.get(row["id"])
+        return rows
+
     async def get_visualization(self, visualization_id: int) -> Optional[Visualization]:
-        """Get a single visualization by ID."""
+        """Get a single visualization by ID, joined with its customization."""
         query = select(Visualization).where(Visualization.id == visualization_id)
-        query = query.options(selectinload(Visualization.customization))
+        query = query.options(joinedload(Visualization.customization))
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
+    async def visualization_exists(self, visualization_id: int) -> bool:
+        """Check that a visualization exists without loading its row."""
+        return await self.db.scalar(
+            select(exists().where(Visualization.id == visualization_id))
+        )
+
+    async def get_visualizations_by_ids(self, visualization_ids: List[int]) -> Dict[int, Visualization]:
+        """Get several visualizations in one query, keyed by ID."""
+        if not visualization_ids:
+            return {}
+        query = select(Visualization).where(Visualization.id.in_(visualization_ids))
+        result = await self.db.execute(query)
+        return {v.id: v for v in result.scalars()}
+
     async def get_visualization_by_metabase_id(self, metabase_question_id: int) -> Optional[Visualization]:
-        """Get visualization by Metabase question ID."""
+        """Get visualization by Metabase question ID, joined with its customization."""
+        # The column is indexed but not unique, so take the first match
         query = select(Visualization).where(
             Visualization.metabase_question_id == metabase_question_id
-        )
-        query = query.options(selectinload(Visualization.customization))
+        ).order_by(Visualization.id).limit(1)
+        query = query.options(joinedload(Visualization.customization))
         result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
@@ -70,19 +130,29 @@ class VisualizationService:
         return await self.get_visualization(visualization.id)
 
     async def update_visualization(self, visualization_id: int, data: VisualizationUpdate) -> Optional[Visualization]:
-        """Update a visualization."""
+        """
+        Update a visualization.
+        Raises LockedFieldsError if the query is locked and the update sets
+        any query field.
+        """
         visualization = await self.get_visualization(visualization_id)
         if not visualization:
             return None
 
         update_data = data.model_dump(exclude_unset=True)
+        if visualization.is_query_locked:
+            # Explicit nulls for query fields pass the lock check, as before
+            locked = sorted(f for f in update_data.keys() & QUERY_FIELDS if update_data[f] is not None)
+            if locked:
+                raise LockedFieldsError(locked)
+
         for field, value in update_data.items():
             setattr(visualization, field, value)
 
+        # The customization is already loaded and updated_at comes back via
+        # RETURNING, so the object is complete without a reload
         await self.db.commit()
-
-        # Reload with relationship to avoid lazy loading issues
-        return await self.get_visualization(visualization_id)
+        return visualization
 
     async def delete_visualization(self, visualization_id: int) -> bool:
         """Delete a visualization."""
@@ -116,7 +186,6 @@ class VisualizationService:
         )
         self.db.add(customization)
         await self.db.commit()
-        await self.db.refresh(customization)
         return customization
 
     async def update_customization(
@@ -124,30 +193,53 @@ class VisualizationService:
         visualization_id: int,
         data: VisualizationCustomizationUpdate,
     ) -> Optional[VisualizationCustomization]:
-        """Update customization for a visualization."""
-        customization = await self.get_customization(visualization_id)
-        if not customization:
-            # Create new customization if it doesn't exist
-            create_data = VisualizationCustomizationCreate(**data.model_dump(exclude_unset=True))
-            return await self.create_customization(visualization_id, create_data)
-
+        """
+        Update (or create) customization for a visualization in a single upsert.
+        Returns None if the visualization does not exist.
+        """
         update_data = data.model_dump(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(customization, field, value)
+        stmt = pg_insert(VisualizationCustomization).values(
+            visualization_id=visualization_id,
+            **{**VisualizationCustomizationCreate().model_dump(), **update_data},
+        )
+        if update_data:
+            # onupdate defaults are not applied to ON CONFLICT, so set updated_at here
+            set_ = {field: stmt.excluded[field] for field in update_data}
+            set_["updated_at"] = func.now()
+        else:
+            # No-op update so the existing row is still returned
+            set_ = {"visualization_id": stmt.excluded.visualization_id}
+        stmt = stmt.on_conflict_do_update(index_elements=["visualization_id"], set_=set_)
+        stmt = stmt.returning(VisualizationCustomization)
 
+        try:
+            result = await self.db.execute(stmt, execution_options={"populate_existing": True})
+        except IntegrityError:
+            # The foreign key rejected an unknown visualization_id
+            await self.db.rollback()
+            return None
+        customization = result.scalar_one()
         await self.db.commit()
-        await self.db.refresh(customization)
         return customization
 
-    async def delete_customization(self, visualization_id: int) -> bool:
-        """Delete customization for a visualization."""
-        customization = await self.get_customization(visualization_id)
-        if not customization:
-            return False
-
-        await self.db.delete(customization)
+    async def delete_customization(self, visualization_id: int) -> Optional[bool]:
+        """
+        Delete customization for a visualization.
+        Returns False if there was no customization and None if the
+        visualization itself does not exist.
+        """
+        result = await self.db.execute(
+            delete(VisualizationCustomization)
+            .where(VisualizationCustomization.visualization_id == visualization_id)
+            .returning(VisualizationCustomization.id)
+        )
+        deleted = result.scalar_one_or_none() is not None
         await self.db.commit()
-        return True
+        if deleted:
+            return True
+
+        # Only the miss path needs to tell the two 404s apart
+        return False if await self.visualization_exists(visualization_id) else None
 
     # ==================== Query Execution ====================
 
@@ -205,6 +297,47 @@ class VisualizationService:
         if not visualization:
             return None
 
+        return await self._run_visualization(visualization, remove_limit)
+
+    async def execute_visualizations(
+        self,
+        visualization_ids: List[int],
+        remove_limit: bool = False
+    ) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Execute several visualizations concurrently.
+
+        The visualizations are loaded in one query up front, so the Metabase
+        calls that follow never touch the session and can run in parallel.
+        Returns a dict of visualization_id -> result (None if failed).
+        """
+        visualizations = await self.get_visualizations_by_ids(visualization_ids)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXECUTIONS)
+
+        async def run(visualization: Visualization) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await self._run_visualization(visualization, remove_limit)
+
+        results = await asyncio.gather(
+            *(run(v) for v in visualizations.values()),
+            return_exceptions=True,
+        )
+
+        executed: Dict[int, Optional[Dict[str, Any]]] = dict.fromkeys(visualization_ids)
+        for viz_id, result in zip(visualizations.keys(), results):
+            if isinstance(result, Exception):
+                logger.warning("Error executing visualization %s: %s", viz_id, result)
+                continue
+            executed[viz_id] = result
+        return executed
+
+    async def _run_visualization(
+        self,
+        visualization: Visualization,
+        remove_limit: bool = False
+    ) -> Optional[Dict[str, Any]]:
+        """Run an already loaded visualization's query against Metabase."""
+        visualization_id = visualization.id
         try:
             metabase = MetabaseService()
             result = None
@@ -251,7 +384,7 @@ class VisualizationService:
 
             # No valid data source
             else:
-                print(f"Visualization {visualization_id} has no valid data source")
+                logger.warning("Visualization %s has no valid data source", visualization_id)
                 return None
 
             # Metabase returns data in format: { "data": { "rows": [...], "cols": [...] } }
@@ -274,5 +407,5 @@ class VisualizationService:
 
             return {"rows": row_dicts}
         except Exception as e:
-            print(f"Error executing visualization {visualization_id}: {e}")
+            logger.warning("Error executing visualization %s: %s", visualization_id, e)
             return None